@@ -1,53 +1,213 @@
+import functools
+import hashlib
 import json
+import logging
+import orjson
 import os
+import random
+import re
 import boto3
 import base64
+import struct
+import secrets
+import time
+from collections import OrderedDict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Resolve env-derived constants once at import time
+REGION = os.environ.get('REGION', 'us-east-1')
+
+# Shared client config - a larger connection pool and TCP keep-alive so the
+# parallel storage/search paths don't serialize on the default 10-connection
+# urllib3 pool, with adaptive retries for throttling
+_BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=60
+)
+
+# Bedrock sees at most a couple of in-flight calls per container, so it keeps
+# a small pool; the big pool is for the S3/vector fan-out paths
+_BEDROCK_CONFIG = _BOTO_CONFIG.merge(Config(max_pool_connections=10))
+
+# Single session so the credential provider chain is resolved once per container
+_BOTO_SESSION = boto3.Session()
+
 # Initialize AWS clients
-s3_client = boto3.client('s3', region_name=os.environ.get('REGION', 'us-east-1'))
-bedrock_client = boto3.client('bedrock-runtime', region_name=os.environ.get('REGION', 'us-east-1'))
-s3vectors_client = boto3.client('s3vectors', region_name=os.environ.get('REGION', 'us-east-1'))
+s3_client = boto3.client('s3', region_name=REGION, config=_BOTO_CONFIG)
+bedrock_client = boto3.client('bedrock-runtime', region_name=REGION, config=_BEDROCK_CONFIG)
+s3vectors_client = boto3.client('s3vectors', region_name=REGION, config=_BOTO_CONFIG)
+lambda_client = boto3.client('lambda', region_name=REGION, config=_BOTO_CONFIG)
+sqs_client = boto3.client('sqs', region_name=REGION, config=_BOTO_CONFIG)
+
+# SQS queue feeding process_analysis_async; when unset we fall back to the
+# legacy async Lambda self-invoke
+ANALYSIS_QUEUE_URL = os.environ.get('ANALYSIS_QUEUE_URL', '')
+VIDEO_BUCKET = os.environ.get('VIDEO_BUCKET')
+# Query embeddings always land under the same prefix, so the Bedrock output
+# config never changes - build it once
+SEARCH_OUTPUT_CONFIG = {
+    's3OutputDataConfig': {
+        's3Uri': f"s3://{VIDEO_BUCKET}/search-embeddings/"
+    }
+}
+
+# Account ID cache - resolved at most once per container
+_ACCOUNT_ID = None
 
 # OpenSearch configuration - initialize only when needed
 opensearch_client = None
 
+# Cached opensearchpy import names - the package is fat, so keep the import
+# lazy for S3 Vectors-only paths but only resolve it once per container
+_opensearchpy_names = None
+
 # S3 Vectors configuration
 S3_VECTOR_BUCKET = None
 S3_VECTOR_INDEX = 'video-embeddings-index'
 VECTOR_DIMENSION = 1024
+_S3V_READY = False
+
+# Set once the OpenSearch index has been verified/created in this container
+_VECTOR_INDEX_READY = False
+
+# Verbose debug logging (CloudWatch I/O is billed per byte)
+_DEBUG = bool(os.environ.get('DEBUG'))
+
+# Structured logging for the hot request paths; level tunable per deployment
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Captures bucket and video folder from the Bedrock embeddings output path in
+# one pass: s3://{bucket}/embeddings/{video_id}/...
+_S3_OUT_RE = re.compile(r'^s3://([^/]+)/embeddings/([^/]+)')
+
+# PutVectors rejects requests with more than 500 vectors
+S3_VECTORS_BATCH_SIZE = 500
+
+# Search queries must contain at least one word character to be embeddable
+_WORD_CHAR_RE = re.compile(r'\w')
+
+# CORS headers never change for the life of the container, so build them once
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': os.environ.get('CORS_ORIGIN', 'http://localhost:3000'),
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
+    'Content-Type': 'application/json'
+}
+# Preflight responses carry no body, so omit Content-Type
+CORS_HEADERS_OPTIONS = {k: v for k, v in CORS_HEADERS.items() if k != 'Content-Type'}
+
+# Shared thread pool - module scope so warm Lambda containers reuse the threads
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Presigned playback URL cache: "bucket/key" -> (url, expiry_epoch). LRU-capped
+# and persisted across warm invocations via module scope
+_URL_CACHE = OrderedDict()
+_URL_CACHE_MAX = 1024
+PRESIGNED_URL_TTL = 3600  # seconds
+_URL_REUSE_MARGIN = 300  # don't serve cached URLs within 5 min of expiry
+
+def _jdumps(obj) -> str:
+    """Serialize a response body with orjson (API Gateway requires str)"""
+    return orjson.dumps(obj).decode()
+
+def _jloads(data):
+    """Deserialize a request/S3 body with orjson; treats None/empty as {}"""
+    return orjson.loads(data or b'{}')
+
+def _json_response(status_code, body, headers=None):
+    """Build an API Gateway response with an orjson-serialized body"""
+    return {
+        'statusCode': status_code,
+        'headers': CORS_HEADERS if headers is None else headers,
+        'body': _jdumps(body)
+    }
+
+def _parse_s3_uri(uri):
+    """Split 's3://bucket/key' into (bucket, key); None if malformed"""
+    if not uri or not uri.startswith('s3://'):
+        return None
+    parts = uri[5:].split('/', 1)
+    if len(parts) != 2 or not parts[0]:
+        return None
+    return parts[0], parts[1]
+
+@functools.lru_cache(maxsize=256)
+def _load_output_json(bucket: str, key: str):
+    """Fetch and parse a completed Bedrock output.json, memoized per container.
+
+    Only safe for Completed invocations - those outputs are immutable, so
+    repeated status polls for the same ARN become a dict lookup instead of
+    an S3 GET plus a multi-MB parse. Callers must not mutate the result.
+    """
+    s3_response = s3_client.get_object(Bucket=bucket, Key=key)
+    return orjson.loads(s3_response['Body'].read())
+
+def with_error_handler(fn):
+    """Catch-all for route handlers: log the traceback once, return a JSON 500.
+
+    Lets the handlers drop their copy-pasted outer try/except; expected 4xx
+    conditions are still handled inside each handler.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception("%s failed", fn.__name__)
+            return {
+                'statusCode': 500,
+                'headers': CORS_HEADERS,
+                'body': _jdumps({'error': str(e)})
+            }
+    return wrapper
 
 def get_account_id():
-    """Get AWS Account ID dynamically"""
+    """Get AWS Account ID dynamically (memoized per container)"""
+    global _ACCOUNT_ID
+    if _ACCOUNT_ID:
+        return _ACCOUNT_ID
+
     account_id = os.environ.get('AWS_ACCOUNT_ID')
     if not account_id:
         # Get account ID dynamically from AWS STS
         try:
-            sts_client = boto3.client('sts', region_name=os.environ.get('REGION', 'us-east-1'))
+            sts_client = _BOTO_SESSION.client('sts', region_name=REGION, config=_BOTO_CONFIG)
             account_id = sts_client.get_caller_identity()['Account']
-            print(f"Dynamically retrieved AWS Account ID: {account_id}")
+            logger.info("Dynamically retrieved AWS Account ID: %s", account_id)
         except Exception as e:
-            print(f"Error retrieving account ID: {e}")
+            logger.error("Error retrieving account ID: %s", e)
             raise ValueError("AWS_ACCOUNT_ID environment variable not set and unable to retrieve from STS")
+
+    _ACCOUNT_ID = account_id
     return account_id
 
 def get_opensearch_client():
     """Initialize OpenSearch client lazily"""
-    global opensearch_client
+    global opensearch_client, _opensearchpy_names
     if opensearch_client is None:
         try:
-            print("Initializing OpenSearch client...")
-            from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
-            
+            logger.info("Initializing OpenSearch client...")
+            if _opensearchpy_names is None:
+                from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+                _opensearchpy_names = (OpenSearch, RequestsHttpConnection, AWSV4SignerAuth)
+            OpenSearch, RequestsHttpConnection, AWSV4SignerAuth = _opensearchpy_names
+
             opensearch_endpoint = os.environ.get('OPENSEARCH_ENDPOINT', '').replace('https://', '')
-            region = os.environ.get('REGION', 'us-east-1')
-            print(f"OpenSearch endpoint: {opensearch_endpoint}, region: {region}")
+            region = REGION
+            logger.info("OpenSearch endpoint: %s, region: %s", opensearch_endpoint, region)
             
-            credentials = boto3.Session().get_credentials()
+            credentials = _BOTO_SESSION.get_credentials()
             # Use AWSV4SignerAuth with 'aoss' service for OpenSearch Serverless
             awsauth = AWSV4SignerAuth(credentials, region, 'aoss')
-            print("AWSV4SignerAuth created successfully for aoss service")
+            logger.info("AWSV4SignerAuth created successfully for aoss service")
 
             opensearch_client = OpenSearch(
                 hosts=[{'host': opensearch_endpoint, 'port': 443}],
@@ -56,42 +216,44 @@ def get_opensearch_client():
                 verify_certs=True,
                 connection_class=RequestsHttpConnection
             )
-            print("OpenSearch client initialized successfully")
+            logger.info("OpenSearch client initialized successfully")
         except Exception as e:
-            print(f"OpenSearch client initialization failed: {e}")
+            logger.error("OpenSearch client initialization failed: %s", e)
             opensearch_client = None
     
     return opensearch_client
 
 def get_or_create_s3_vector_bucket():
     """Get or create S3 Vector bucket and index"""
-    global S3_VECTOR_BUCKET
+    global S3_VECTOR_BUCKET, _S3V_READY
+    # Once the bucket and index have been verified in this container, skip the
+    # two existence probes (pure RTT on warm invocations)
+    if _S3V_READY:
+        return S3_VECTOR_BUCKET
+
     if S3_VECTOR_BUCKET is None:
         try:
             # Generate unique bucket name
             account_id = get_account_id()
-            region = os.environ.get('REGION', 'us-east-1')
-            S3_VECTOR_BUCKET = f"video-s3vectors-{account_id}-{region}"
-            print(f"Using S3 Vector bucket: {S3_VECTOR_BUCKET}")
+            S3_VECTOR_BUCKET = f"video-s3vectors-{account_id}-{REGION}"
+            logger.info("Using S3 Vector bucket: %s", S3_VECTOR_BUCKET)
             
             # Check if vector bucket exists, create if not
             try:
                 # Try to get vector bucket directly
                 s3vectors_client.get_vector_bucket(vectorBucketName=S3_VECTOR_BUCKET)
-                print(f"S3 Vector bucket {S3_VECTOR_BUCKET} already exists")
-            except Exception as e:
-                if 'NotFoundException' in str(e) or 'could not be found' in str(e) or 'does not exist' in str(e).lower():
-                    print(f"Vector bucket not found. Creating S3 Vector bucket: {S3_VECTOR_BUCKET}")
-                    s3vectors_client.create_vector_bucket(vectorBucketName=S3_VECTOR_BUCKET)
-                    print(f"S3 Vector bucket {S3_VECTOR_BUCKET} created successfully")
-                    
-                    # Wait a moment for bucket to be available
-                    import time
-                    time.sleep(2)
-                else:
-                    print(f"Error checking S3 Vector bucket: {e}")
-                    raise
-            
+                logger.info("S3 Vector bucket %s already exists", S3_VECTOR_BUCKET)
+            except s3vectors_client.exceptions.NotFoundException:
+                logger.info("Vector bucket not found. Creating S3 Vector bucket: %s", S3_VECTOR_BUCKET)
+                s3vectors_client.create_vector_bucket(vectorBucketName=S3_VECTOR_BUCKET)
+                logger.info("S3 Vector bucket %s created successfully", S3_VECTOR_BUCKET)
+
+                # Wait a moment for bucket to be available
+                time.sleep(2)
+            except ClientError as e:
+                logger.error("Error checking S3 Vector bucket: %s", e)
+                raise
+
             # Check if vector index exists, create if not
             try:
                 # Try to get vector index directly
@@ -99,37 +261,63 @@ def get_or_create_s3_vector_bucket():
                     vectorBucketName=S3_VECTOR_BUCKET,
                     indexName=S3_VECTOR_INDEX
                 )
-                print(f"S3 Vector index {S3_VECTOR_INDEX} already exists")
-            except Exception as e:
-                if 'NotFoundException' in str(e) or 'could not be found' in str(e) or 'does not exist' in str(e).lower():
-                    print(f"Vector index not found. Creating S3 Vector index: {S3_VECTOR_INDEX}")
-                    s3vectors_client.create_index(
-                        vectorBucketName=S3_VECTOR_BUCKET,
-                        indexName=S3_VECTOR_INDEX,
-                        dataType='float32',
-                        dimension=VECTOR_DIMENSION,
-                        distanceMetric='cosine'
-                    )
-                    print(f"S3 Vector index {S3_VECTOR_INDEX} created successfully")
-                    
-                    # Wait a moment for index to be available
-                    import time
-                    time.sleep(2)
-                else:
-                    print(f"Error checking S3 Vector index: {e}")
-                    raise
+                logger.info("S3 Vector index %s already exists", S3_VECTOR_INDEX)
+            except s3vectors_client.exceptions.NotFoundException:
+                logger.info("Vector index not found. Creating S3 Vector index: %s", S3_VECTOR_INDEX)
+                s3vectors_client.create_index(
+                    vectorBucketName=S3_VECTOR_BUCKET,
+                    indexName=S3_VECTOR_INDEX,
+                    dataType='int8',
+                    dimension=VECTOR_DIMENSION,
+                    distanceMetric='cosine'
+                )
+                logger.info("S3 Vector index %s created successfully", S3_VECTOR_INDEX)
+
+                # Wait a moment for index to be available
+                time.sleep(2)
+            except ClientError as e:
+                logger.error("Error checking S3 Vector index: %s", e)
+                raise
             
+            _S3V_READY = True
+
         except Exception as e:
-            print(f"Error initializing S3 Vector bucket/index: {e}")
+            logger.error("Error initializing S3 Vector bucket/index: %s", e)
             S3_VECTOR_BUCKET = None
             raise
-    
+
     return S3_VECTOR_BUCKET
 
+def _quantize_int8(embedding):
+    """Symmetrically quantize a float embedding to int8, returning (values, scale)
+
+    Scaling preserves vector direction, so cosine distances are unaffected;
+    int8 cuts PutVectors/QueryVectors payloads 4x vs float32.
+    """
+    max_abs = max(abs(v) for v in embedding) or 1.0
+    scale = max_abs / 127.0
+    return [round(v / scale) for v in embedding], scale
+
+def _put_vectors_batch(bucket_name, batch):
+    """Put one batch of vectors, splitting in half and retrying if it is still too large"""
+    try:
+        s3vectors_client.put_vectors(
+            vectorBucketName=bucket_name,
+            indexName=S3_VECTOR_INDEX,
+            vectors=batch
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ValidationException' and len(batch) > 1:
+            mid = len(batch) // 2
+            logger.info("PutVectors batch of %s rejected, splitting and retrying", len(batch))
+            _put_vectors_batch(bucket_name, batch[:mid])
+            _put_vectors_batch(bucket_name, batch[mid:])
+        else:
+            raise
+
 def store_embeddings_to_s3_vectors(video_id, video_s3_uri, embedding_data_list):
     """Store video embeddings to S3 Vectors"""
     try:
-        import time
         start_time = time.time()
         
         bucket_name = get_or_create_s3_vector_bucket()
@@ -140,34 +328,51 @@ def store_embeddings_to_s3_vectors(video_id, video_s3_uri, embedding_data_list):
         if not isinstance(embedding_data_list, list):
             embedding_data_list = [embedding_data_list]
         
-        vectors = []
-        for i, embedding_data in enumerate(embedding_data_list):
-            segment_id = f"{video_id}_segment_{i}_{embedding_data.get('startSec', 0)}"
-            
-            vectors.append({
-                "key": segment_id,
-                "data": {"float32": embedding_data.get('embedding', [])},
-                "metadata": {
-                    "videoId": video_id,
-                    "videoS3Uri": video_s3_uri,
-                    "segmentId": segment_id,
-                    "startSec": embedding_data.get('startSec', 0),
-                    "endSec": embedding_data.get('endSec', 0),
-                    "duration": embedding_data.get('endSec', 0) - embedding_data.get('startSec', 0),
-                    "embeddingOption": embedding_data.get('embeddingOption', 'visual-text')
-                }
-            })
-        
-        # Store vectors in S3 Vectors
-        s3vectors_client.put_vectors(
-            vectorBucketName=bucket_name,
-            indexName=S3_VECTOR_INDEX,
-            vectors=vectors
-        )
+        segment_prefix = f"{video_id}_segment_"
+        # Pre-extract the fields once, then build the vectors in a single list
+        # comprehension instead of growing the list with per-iteration appends.
+        # Segments without a full-dimension embedding are skipped up front -
+        # they would only fail server-side validation and poison the batch.
+        # The original list index rides along so segment ids stay aligned
+        # with OpenSearch (which skips via continue) even when a segment is
+        # dropped, and re-ingests upsert the same S3 Vectors keys
+        extracted = [(i,
+                      embedding_data.get('startSec', 0),
+                      embedding_data.get('endSec', 0),
+                      embedding_data.get('embedding', []),
+                      embedding_data.get('embeddingOption', 'visual-text'))
+                     for i, embedding_data in enumerate(embedding_data_list)]
+        skipped = sum(1 for _, _, _, emb, _ in extracted
+                      if not emb or len(emb) != VECTOR_DIMENSION)
+        if skipped:
+            logger.info("S3 Vectors: Skipping %s segments without valid embeddings", skipped)
+            extracted = [entry for entry in extracted
+                         if entry[3] and len(entry[3]) == VECTOR_DIMENSION]
+        quantized = [(i, start, end, opt) + _quantize_int8(emb)
+                     for i, start, end, emb, opt in extracted]
+        vectors = [{
+            "key": f"{segment_prefix}{i}_{start}",
+            "data": {"int8": qvec},
+            "metadata": {
+                "videoId": video_id,
+                "videoS3Uri": video_s3_uri,
+                "segmentId": f"{segment_prefix}{i}_{start}",
+                "startSec": start,
+                "endSec": end,
+                "duration": end - start,
+                "embeddingOption": opt,
+                "scale": scale
+            }
+        } for i, start, end, opt, qvec, scale in quantized]
         
+        # Store vectors in S3 Vectors in parallel batches of 500
+        batches = [vectors[i:i + S3_VECTORS_BATCH_SIZE]
+                   for i in range(0, len(vectors), S3_VECTORS_BATCH_SIZE)]
+        list(_EXECUTOR.map(lambda batch: _put_vectors_batch(bucket_name, batch), batches))
+
         storage_time = time.time() - start_time
-        print(f"S3 Vectors: Stored {len(vectors)} vectors in {storage_time:.3f}s")
-        
+        logger.info("S3 Vectors: Stored %s vectors in %.3fs", len(vectors), storage_time)
+
         return {
             'stored_count': len(vectors),
             'video_id': video_id,
@@ -175,13 +380,12 @@ def store_embeddings_to_s3_vectors(video_id, video_s3_uri, embedding_data_list):
         }
         
     except Exception as e:
-        print(f"Error storing embeddings to S3 Vectors: {e}")
+        logger.error("Error storing embeddings to S3 Vectors: %s", e)
         raise
 
-def search_opensearch(query_embedding, top_k=10):
+def search_opensearch(query_embedding, top_k=10, include_metadata=True):
     """Search OpenSearch for similar embeddings"""
     try:
-        import time
         start_time = time.time()
         
         opensearch = get_opensearch_client()
@@ -201,6 +405,12 @@ def search_opensearch(query_embedding, top_k=10):
                 }
             raise
         
+        # String fields come from _source; numeric temporal fields are read from
+        # doc values, which are stored columnar and avoid loading full _source
+        source_fields = ["videoId", "videoS3Uri", "segmentId", "embeddingOption"]
+        if include_metadata:
+            source_fields.append("metadata")
+
         search_body = {
             "size": top_k,
             "query": {
@@ -211,32 +421,34 @@ def search_opensearch(query_embedding, top_k=10):
                     }
                 }
             },
-            "_source": ["videoId", "videoS3Uri", "segmentId", "startSec", "endSec", "duration", "embeddingOption", "metadata"]
+            "_source": source_fields,
+            "docvalue_fields": ["startSec", "endSec", "duration"]
         }
-        
+
         search_response = opensearch.search(
             index='video-embeddings',
             body=search_body
         )
-        
+
         search_time = time.time() - start_time
-        
+
         results = []
         for hit in search_response['hits']['hits']:
             source = hit['_source']
+            fields = hit.get('fields', {})
             results.append({
                 'videoId': source.get('videoId', 'unknown'),
                 'videoS3Uri': source.get('videoS3Uri', ''),
                 'segmentId': source.get('segmentId', ''),
-                'startSec': source.get('startSec', 0),
-                'endSec': source.get('endSec', 0),
-                'duration': source.get('duration', 0),
+                'startSec': fields.get('startSec', [0])[0],
+                'endSec': fields.get('endSec', [0])[0],
+                'duration': fields.get('duration', [0])[0],
                 'embeddingOption': source.get('embeddingOption', 'visual-text'),
                 'score': hit['_score'],
                 'metadata': source.get('metadata', {})
             })
         
-        print(f"OpenSearch: Found {len(results)} results in {search_time:.3f}s")
+        logger.info("OpenSearch: Found %s results in %.3fs", len(results), search_time)
         
         return {
             'results': results,
@@ -252,24 +464,27 @@ def search_opensearch(query_embedding, top_k=10):
                 'search_time_ms': 0,
                 'message': 'No videos indexed yet - upload and process videos with embeddings first'
             }
-        print(f"Error searching OpenSearch: {e}")
+        logger.error("Error searching OpenSearch: %s", e)
         raise
 
 def search_s3_vectors(query_embedding, top_k=10):
     """Search S3 Vectors for similar embeddings"""
     try:
-        import time
         start_time = time.time()
         
         bucket_name = get_or_create_s3_vector_bucket()
         if not bucket_name:
             raise Exception("S3 Vector bucket not available")
         
+        # Quantize the query with its own scale - cosine distance is invariant
+        # to the per-vector scaling used at ingest
+        query_int8, _ = _quantize_int8(query_embedding)
+
         # Query the S3 Vector index
         response = s3vectors_client.query_vectors(
             vectorBucketName=bucket_name,
             indexName=S3_VECTOR_INDEX,
-            queryVector={"float32": query_embedding},
+            queryVector={"int8": query_int8},
             topK=top_k,
             returnDistance=True,
             returnMetadata=True
@@ -293,7 +508,7 @@ def search_s3_vectors(query_embedding, top_k=10):
                 'metadata': metadata
             })
         
-        print(f"S3 Vectors: Found {len(results)} results in {search_time:.3f}s")
+        logger.info("S3 Vectors: Found %s results in %.3fs", len(results), search_time)
         
         return {
             'results': results,
@@ -302,34 +517,47 @@ def search_s3_vectors(query_embedding, top_k=10):
         }
         
     except Exception as e:
-        print(f"Error searching S3 Vectors: {e}")
+        logger.error("Error searching S3 Vectors: %s", e)
         raise
 
 def ensure_vector_index(opensearch_client):
     """Ensure the vector index exists with proper mapping"""
+    global _VECTOR_INDEX_READY
     index_name = 'video-embeddings'
-    
+
+    # Once verified in this container, skip the exists/mapping round-trips -
+    # store_embeddings_to_opensearch calls this on every single ingest
+    if _VECTOR_INDEX_READY:
+        return
+
     try:
         # Check if index exists
         if opensearch_client.indices.exists(index=index_name):
-            print(f"Index {index_name} already exists")
+            logger.info("Index %s already exists", index_name)
             # Check current mapping
             try:
-                mapping = opensearch_client.indices.get_mapping(index=index_name)
-                print(f"Current index mapping: {json.dumps(mapping, indent=2)}")
-                
+                # Only the embedding field type is needed - filter_path keeps the
+                # response to a few bytes instead of the full mapping
+                mapping = opensearch_client.indices.get_mapping(
+                    index=index_name,
+                    filter_path=f'{index_name}.mappings.properties.embedding.type'
+                )
+                if os.environ.get('DEBUG'):
+                    logger.info("Current index mapping: %s", json.dumps(mapping, indent=2))
+
                 # Check if embedding field is knn_vector
                 properties = mapping.get(index_name, {}).get('mappings', {}).get('properties', {})
                 embedding_field = properties.get('embedding', {})
                 if embedding_field.get('type') != 'knn_vector':
-                    print(f"WARNING: embedding field type is {embedding_field.get('type')}, not knn_vector")
-                    print("Deleting and recreating index with correct mapping...")
+                    logger.warning("WARNING: embedding field type is %s, not knn_vector", embedding_field.get('type'))
+                    logger.info("Deleting and recreating index with correct mapping...")
                     opensearch_client.indices.delete(index=index_name)
                 else:
-                    print("Index has correct knn_vector mapping")
+                    logger.info("Index has correct knn_vector mapping")
+                    _VECTOR_INDEX_READY = True
                     return
             except Exception as e:
-                print(f"Error checking mapping: {e}")
+                logger.error("Error checking mapping: %s", e)
                 return
         
         # Create index with knn_vector mapping and temporal fields
@@ -369,10 +597,19 @@ def ensure_vector_index(opensearch_client):
                         "method": {
                             "name": "hnsw",
                             "space_type": "cosinesimil",
-                            "engine": "nmslib",
+                            # faiss with fp16 scalar quantization halves the
+                            # in-memory bytes per vector vs nmslib/float32, so
+                            # more of the HNSW graph stays cache-resident
+                            "engine": "faiss",
                             "parameters": {
-                                "ef_construction": 512,
-                                "m": 16
+                                "ef_construction": 256,
+                                "m": 16,
+                                "encoder": {
+                                    "name": "sq",
+                                    "parameters": {
+                                        "type": "fp16"
+                                    }
+                                }
                             }
                         }
                     },
@@ -384,41 +621,41 @@ def ensure_vector_index(opensearch_client):
         }
         
         opensearch_client.indices.create(index=index_name, body=index_body)
-        print(f"Created index {index_name} with knn_vector mapping")
-        
+        logger.info("Created index %s with knn_vector mapping", index_name)
+        _VECTOR_INDEX_READY = True
+
     except Exception as e:
-        print(f"Error ensuring vector index: {e}")
+        logger.error("Error ensuring vector index: %s", e)
         raise
 
 def store_embeddings_dual(bedrock_response, embedding_data_list):
     """Store video embeddings to both OpenSearch and S3 Vectors for comparison"""
-    print("🗂️ === DUAL EMBEDDING STORAGE DEBUG START ===")
-    print(f"📡 bedrock_response keys: {list(bedrock_response.keys()) if isinstance(bedrock_response, dict) else 'Not a dict'}")
-    print(f"📡 bedrock_response content: {bedrock_response}")
-    print(f"📊 embedding_data_list length: {len(embedding_data_list) if isinstance(embedding_data_list, list) else 'Not a list'}")
-    
-    # Initialize storage results
-    opensearch_result = None
-    s3vectors_result = None
+    logger.info("🗂️ === DUAL EMBEDDING STORAGE DEBUG START ===")
+    logger.info("📡 bedrock_response keys: %s", list(bedrock_response.keys()) if isinstance(bedrock_response, dict) else 'Not a dict')
+    logger.info("📡 bedrock_response content: %s", bedrock_response)
+    logger.info("📊 embedding_data_list length: %s", len(embedding_data_list) if isinstance(embedding_data_list, list) else 'Not a list')
     
-    # Store to OpenSearch
+    # Extract video metadata for S3 Vectors storage
+    video_id, video_s3_uri = extract_video_metadata(bedrock_response)
+
+    # Both backends are independent blocking I/O - run them concurrently so the
+    # dual write costs max(OpenSearch, S3 Vectors) instead of the sum
+    opensearch_future = _EXECUTOR.submit(store_embeddings_to_opensearch, bedrock_response, embedding_data_list)
+    s3vectors_future = _EXECUTOR.submit(store_embeddings_to_s3_vectors, video_id, video_s3_uri, embedding_data_list)
+
     try:
-        opensearch_result = store_embeddings_to_opensearch(bedrock_response, embedding_data_list)
+        opensearch_result = opensearch_future.result()
     except Exception as e:
-        print(f"OpenSearch storage failed: {e}")
+        logger.error("OpenSearch storage failed: %s", e)
         opensearch_result = {'error': str(e)}
-    
-    # Extract video metadata for S3 Vectors storage
-    video_id, video_s3_uri = extract_video_metadata(bedrock_response)
-    
-    # Store to S3 Vectors
+
     try:
-        s3vectors_result = store_embeddings_to_s3_vectors(video_id, video_s3_uri, embedding_data_list)
+        s3vectors_result = s3vectors_future.result()
     except Exception as e:
-        print(f"S3 Vectors storage failed: {e}")
+        logger.error("S3 Vectors storage failed: %s", e)
         s3vectors_result = {'error': str(e)}
-    
-    print("🗂️ === DUAL EMBEDDING STORAGE DEBUG END ===")
+
+    logger.info("🗂️ === DUAL EMBEDDING STORAGE DEBUG END ===")
     
     return {
         'opensearch': opensearch_result,
@@ -436,43 +673,39 @@ def extract_video_metadata(bedrock_response):
     media_source = model_input.get('mediaSource', {})
     s3_location = media_source.get('s3Location', {})
     video_s3_uri = s3_location.get('uri', '')
-    
-    print(f"🔍 DEBUG: Method 1 - modelInput approach: '{video_s3_uri}'")
-    
+
+    if _DEBUG:
+        logger.info("🔍 DEBUG: Method 1 - modelInput approach: '%s'", video_s3_uri)
+
     # Method 2: Extract from output path structure if Method 1 fails
     if not video_s3_uri:
         output_data_config = bedrock_response.get('outputDataConfig', {})
         s3_output_config = output_data_config.get('s3OutputDataConfig', {})
         output_s3_uri = s3_output_config.get('s3Uri', '')
-        
-        print(f"🔍 DEBUG: Method 2 - output_s3_uri: '{output_s3_uri}'")
-        
+
+        if _DEBUG:
+            logger.info("🔍 DEBUG: Method 2 - output_s3_uri: '%s'", output_s3_uri)
+
         # The output path structure is: s3://bucket/embeddings/{video_id}/
-        # We can extract video_id from this path and reconstruct the original video S3 URI
-        if output_s3_uri and '/embeddings/' in output_s3_uri:
-            path_parts = output_s3_uri.replace('s3://', '').split('/')
-            bucket_name = path_parts[0]
-            
-            # Find the video_id from the path after /embeddings/
-            try:
-                embeddings_index = path_parts.index('embeddings')
-                if embeddings_index + 1 < len(path_parts):
-                    extracted_folder_name = path_parts[embeddings_index + 1]
-                    
-                    # The folder name is the video filename without extension
-                    # We need to reconstruct the full video filename
-                    video_filename = f"{extracted_folder_name}.mp4"  # Assume mp4 for now
-                    
-                    # Reconstruct the original video S3 URI
-                    video_s3_uri = f"s3://{bucket_name}/videos/{video_filename}"
-                    video_id = extracted_folder_name  # Keep video_id without extension
-                    
-                    print(f"🔍 DEBUG: Method 2 success - folder name: '{extracted_folder_name}', video_id: '{video_id}', reconstructed S3 URI: '{video_s3_uri}'")
-                else:
-                    print(f"🔍 DEBUG: Method 2 failed - could not find video_id in path")
-            except (ValueError, IndexError) as e:
-                print(f"🔍 DEBUG: Method 2 failed - error parsing output path: {e}")
-        
+        # One compiled-regex pass captures bucket and video_id so we can
+        # reconstruct the original video S3 URI
+        match = _S3_OUT_RE.match(output_s3_uri) if output_s3_uri else None
+        if match:
+            bucket_name, extracted_folder_name = match.group(1), match.group(2)
+
+            # The folder name is the video filename without extension
+            # We need to reconstruct the full video filename
+            video_filename = f"{extracted_folder_name}.mp4"  # Assume mp4 for now
+
+            # Reconstruct the original video S3 URI
+            video_s3_uri = f"s3://{bucket_name}/videos/{video_filename}"
+            video_id = extracted_folder_name  # Keep video_id without extension
+
+            if _DEBUG:
+                logger.info("🔍 DEBUG: Method 2 success - folder name: '%s', video_id: '%s', reconstructed S3 URI: '%s'", extracted_folder_name, video_id, video_s3_uri)
+        elif _DEBUG:
+            logger.error("🔍 DEBUG: Method 2 failed - could not find video_id in path")
+
     # If video_id is still unknown, try to extract from S3 URI as fallback
     if video_id == 'unknown' and video_s3_uri and video_s3_uri.startswith('s3://'):
         # Parse s3://bucket/path/to/file.mp4 -> file.mp4
@@ -482,16 +715,17 @@ def extract_video_metadata(bedrock_response):
             video_id = extracted_id.rsplit('.', 1)[0]
         else:
             video_id = extracted_id
-        print(f"🔍 DEBUG: Fallback extraction from S3 URI - video_id: '{video_id}'")
+        if _DEBUG:
+            logger.info("🔍 DEBUG: Fallback extraction from S3 URI - video_id: '%s'", video_id)
     
     if video_id == 'unknown' or not video_s3_uri:
-        print(f"⚠️ WARNING: Could not extract proper video metadata - video_id: '{video_id}', S3 URI: '{video_s3_uri}'")
+        logger.warning("⚠️ WARNING: Could not extract proper video metadata - video_id: '%s', S3 URI: '%s'", video_id, video_s3_uri)
     
     return video_id, video_s3_uri
 
 def store_embeddings_to_opensearch(bedrock_response, embedding_data_list):
     """Store video embeddings with temporal segments to OpenSearch for similarity search"""
-    print("🗂️ === OPENSEARCH EMBEDDING STORAGE START ===")
+    logger.info("🗂️ === OPENSEARCH EMBEDDING STORAGE START ===")
     
     opensearch = get_opensearch_client()
     if not opensearch:
@@ -503,33 +737,47 @@ def store_embeddings_to_opensearch(bedrock_response, embedding_data_list):
     # Extract video metadata using shared function
     video_id, video_s3_uri = extract_video_metadata(bedrock_response)
     
-    import time
     start_time = time.time()
     
-    print(f"🗂️ Processing OpenSearch storage for video: {video_id}, S3 URI: {video_s3_uri}")
+    logger.info("🗂️ Processing OpenSearch storage for video: %s, S3 URI: %s", video_id, video_s3_uri)
     
     stored_count = 0
-    responses = []
-    
+
     # Handle both single embedding and list of embeddings
     if not isinstance(embedding_data_list, list):
         embedding_data_list = [embedding_data_list]
-    
-    # Store each temporal segment as a separate document
+
+    # Build one bulk request for all temporal segments instead of issuing one
+    # signed HTTPS round-trip per document
+    segment_prefix = f"{video_id}_segment_"
+    bulk_body = []
+    skipped = 0
     for i, embedding_data in enumerate(embedding_data_list):
+        # Bind the fields once per segment instead of re-probing the dict
+        start = embedding_data.get('startSec', 0)
+        end = embedding_data.get('endSec', 0)
+        emb = embedding_data.get('embedding', [])
+        opt = embedding_data.get('embeddingOption', 'visual-text')
+
+        # Skip segments without a full-dimension embedding rather than
+        # indexing zero-length vectors
+        if not emb or len(emb) != VECTOR_DIMENSION:
+            skipped += 1
+            continue
+
         # Create unique document ID for each segment
-        segment_id = f"{video_id}_segment_{i}_{embedding_data.get('startSec', 0)}"
-        
+        segment_id = f"{segment_prefix}{i}_{start}"
+
         # Prepare document for OpenSearch
         document = {
             'videoId': video_id,
             'videoS3Uri': video_s3_uri,
             'segmentId': segment_id,
-            'startSec': embedding_data.get('startSec', 0),
-            'endSec': embedding_data.get('endSec', 0),
-            'duration': embedding_data.get('endSec', 0) - embedding_data.get('startSec', 0),
-            'embedding': embedding_data.get('embedding', []),
-            'embeddingOption': embedding_data.get('embeddingOption', 'visual-text'),
+            'startSec': start,
+            'endSec': end,
+            'duration': end - start,
+            'embedding': emb,
+            'embeddingOption': opt,
             'metadata': {
                 'modelId': bedrock_response.get('modelId', ''),
                 'invocationArn': bedrock_response.get('invocationArn', ''),
@@ -538,20 +786,29 @@ def store_embeddings_to_opensearch(bedrock_response, embedding_data_list):
                 'totalSegments': len(embedding_data_list)
             }
         }
-        
-        print(f"Storing segment {i+1}/{len(embedding_data_list)}: {embedding_data.get('startSec', 0)}-{embedding_data.get('endSec', 0)}s, embedding length: {len(document['embedding'])}, type: {document['embeddingOption']}")
-        
-        # Index the document without explicit ID (OpenSearch Serverless doesn't support it)
-        response = opensearch.index(
-            index='video-embeddings',
-            body=document
-        )
-        
-        responses.append(response)
-        stored_count += 1
-    
+
+        # Index action without explicit ID (OpenSearch Serverless doesn't support it)
+        bulk_body.append({'index': {'_index': 'video-embeddings'}})
+        bulk_body.append(document)
+
+    # Send in sub-batches to stay under the request size limit for large videos
+    batch_size = 500  # documents per bulk call
+    for batch_start in range(0, len(bulk_body), batch_size * 2):
+        batch = bulk_body[batch_start:batch_start + batch_size * 2]
+        response = opensearch.bulk(body=batch)
+
+        for item in response.get('items', []):
+            index_result = item.get('index', {})
+            if index_result.get('error'):
+                logger.error("Bulk index error for segment: %s", index_result['error'])
+            else:
+                stored_count += 1
+
+    if skipped:
+        logger.info("OpenSearch: Skipped %s segments without valid embeddings", skipped)
+
     storage_time = time.time() - start_time
-    print(f"OpenSearch: Stored {stored_count} segments in {storage_time:.3f}s")
+    logger.info("OpenSearch: Stored %s segments in %.3fs", stored_count, storage_time)
     # Return simplified response to avoid Lambda 413 error with large responses
     return {
         'stored_count': stored_count, 
@@ -559,81 +816,76 @@ def store_embeddings_to_opensearch(bedrock_response, embedding_data_list):
         'storage_time_ms': round(storage_time * 1000, 2)
     }
 
+@with_error_handler
 def handle_flush_opensearch(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Flush/delete all documents from the OpenSearch vector index"""
-    try:
-        print("🗑️ Starting OpenSearch index flush...")
-        
-        opensearch = get_opensearch_client()
-        if not opensearch:
-            return {
-                'statusCode': 500,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'OpenSearch client not available'})
-            }
-        
-        index_name = 'video-embeddings'
-        
-        # Check if index exists
-        if not opensearch.indices.exists(index=index_name):
-            print(f"Index {index_name} does not exist")
-            return {
-                'statusCode': 200,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'message': f'Index {index_name} does not exist - nothing to flush',
-                    'documents_deleted': 0
-                })
-            }
-        
-        # Get current document count
-        try:
-            count_response = opensearch.count(index=index_name)
-            total_docs = count_response.get('count', 0)
-            print(f"Found {total_docs} documents to delete")
-        except Exception as e:
-            print(f"Could not get document count: {e}")
-            total_docs = "unknown"
-        
-        # Delete all documents using delete_by_query
-        delete_response = opensearch.delete_by_query(
-            index=index_name,
-            body={
-                "query": {
-                    "match_all": {}
-                }
-            },
-            refresh=True  # Refresh the index after deletion
-        )
-        
-        deleted_count = delete_response.get('deleted', 0)
-        print(f"Successfully deleted {deleted_count} documents from {index_name}")
-        
+    logger.info("🗑️ Starting OpenSearch index flush...")
+    
+    opensearch = get_opensearch_client()
+    if not opensearch:
         return {
-            'statusCode': 200,
+            'statusCode': 500,
             'headers': cors_headers,
-            'body': json.dumps({
-                'message': f'Successfully flushed OpenSearch index {index_name}',
-                'documents_before': total_docs,
-                'documents_deleted': deleted_count,
-                'took_ms': delete_response.get('took', 0)
-            })
+            'body': _jdumps({'error': 'OpenSearch client not available'})
         }
-        
-    except Exception as e:
-        print(f"Error flushing OpenSearch: {e}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+    
+    index_name = 'video-embeddings'
+    
+    # Check if index exists
+    if not opensearch.indices.exists(index=index_name):
+        logger.info("Index %s does not exist", index_name)
         return {
-            'statusCode': 500,
+            'statusCode': 200,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'Failed to flush OpenSearch: {str(e)}'})
+            'body': _jdumps({
+                'message': f'Index {index_name} does not exist - nothing to flush',
+                'documents_deleted': 0
+            })
         }
+    
+    # Get current document count
+    try:
+        count_response = opensearch.count(index=index_name)
+        total_docs = count_response.get('count', 0)
+        logger.info("Found %s documents to delete", total_docs)
+    except Exception as e:
+        logger.info("Could not get document count: %s", e)
+        total_docs = "unknown"
+    
+    # Delete all documents using delete_by_query - sliced so the delete
+    # parallelizes across shards server-side, proceeding past version
+    # conflicts from concurrent ingest, and without forcing a refresh
+    delete_response = opensearch.delete_by_query(
+        index=index_name,
+        body={
+            "query": {
+                "match_all": {}
+            }
+        },
+        slices='auto',
+        conflicts='proceed',
+        refresh=False
+    )
+    
+    deleted_count = delete_response.get('deleted', 0)
+    logger.info("Successfully deleted %s documents from %s", deleted_count, index_name)
+    
+    return {
+        'statusCode': 200,
+        'headers': cors_headers,
+        'body': _jdumps({
+            'message': f'Successfully flushed OpenSearch index {index_name}',
+            'documents_before': total_docs,
+            'documents_deleted': deleted_count,
+            'took_ms': delete_response.get('took', 0)
+        })
+    }
+    
 
 def process_analysis_async(event: Dict[str, Any]) -> Dict[str, Any]:
     """Process video analysis asynchronously (called via direct Lambda invoke)"""
     try:
-        print("=== ASYNC ANALYSIS PROCESSING START ===")
+        logger.info("=== ASYNC ANALYSIS PROCESSING START ===")
         
         analysis_job_id = event.get('analysisJobId')
         s3_uri = event.get('s3Uri')
@@ -641,16 +893,31 @@ def process_analysis_async(event: Dict[str, Any]) -> Dict[str, Any]:
         video_id = event.get('videoId')
         bucket_name = event.get('bucketName')
         
-        print(f"Processing async analysis - Job ID: {analysis_job_id}")
-        print(f"S3 URI: {s3_uri}, Video ID: {video_id}")
-        print(f"Prompt length: {len(prompt) if prompt else 0}")
+        logger.info("Processing async analysis - Job ID: %s", analysis_job_id)
+        logger.info("S3 URI: %s, Video ID: %s", s3_uri, video_id)
+        logger.info("Prompt length: %s", len(prompt) if prompt else 0)
         
         if not all([analysis_job_id, s3_uri, prompt, bucket_name]):
             raise ValueError("Missing required parameters for async analysis processing")
-        
-        import time
+
+        # When the job arrived via SQS, the InProgress job_info rides in the
+        # message and is persisted here instead of on the /analyze hot path
+        initial_job_info = event.get('jobInfo')
+        if initial_job_info:
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=f"analysis/{analysis_job_id}/job_info.json",
+                Body=orjson.dumps(initial_job_info),
+                ContentType='application/json'
+            )
+
+        # Short availability check off the synchronous path - covers the rare
+        # case where the upload is still settling when the job is dequeued
+        if not wait_for_s3_object(s3_uri, max_wait_seconds=10):
+            raise ValueError(f"Video file not found in S3: {s3_uri}")
+
         start_time = time.time()
-        
+
         # Use invoke_model for Pegasus
         request_body = {
             "inputPrompt": prompt,
@@ -664,19 +931,27 @@ def process_analysis_async(event: Dict[str, Any]) -> Dict[str, Any]:
             "maxOutputTokens": 4096
         }
         
-        print(f"Calling Bedrock Pegasus model with request: {json.dumps(request_body, indent=2)}")
-        
+        if os.environ.get('DEBUG'):
+            logger.info("Calling Bedrock Pegasus model with request: %s", json.dumps(request_body, indent=2))
+
         response = bedrock_client.invoke_model(
             modelId='us.twelvelabs.pegasus-1-2-v1:0',
-            body=json.dumps(request_body),
+            body=orjson.dumps(request_body),
             contentType='application/json'
         )
         
-        print(f"Bedrock response status: {response['ResponseMetadata']['HTTPStatusCode']}")
-        response_body = json.loads(response['body'].read())
-        print(f"Analysis completed successfully. Response keys: {list(response_body.keys())}")
-        
-        # Store the analysis result in S3
+        logger.info("Bedrock response status: %s", response['ResponseMetadata']['HTTPStatusCode'])
+        # orjson parses the StreamingBody bytes directly, without the extra
+        # UTF-8 decode pass stdlib json would do
+        response_body = orjson.loads(response['body'].read())
+        logger.info("Analysis completed successfully. Response keys: %s", list(response_body.keys()))
+        
+        # Store the analysis result in S3 - compute the timing fields once so
+        # both files carry consistent timestamps
+        end_time = time.time()
+        completed_time = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(end_time))
+        elapsed = end_time - start_time
+
         analysis_result = {
             'jobId': analysis_job_id,
             'status': 'Completed',
@@ -685,82 +960,90 @@ def process_analysis_async(event: Dict[str, Any]) -> Dict[str, Any]:
             'prompt': prompt,
             'analysis': response_body.get('message', ''),
             'finishReason': response_body.get('finishReason', ''),
-            'endTime': time.time(),
-            'completedTime': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
-            'processingTimeSeconds': time.time() - start_time
+            'endTime': end_time,
+            'completedTime': completed_time,
+            'processingTimeSeconds': elapsed
         }
-        
-        # Store completed result
+
         result_key = f"analysis/{analysis_job_id}/result.json"
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=result_key,
-            Body=json.dumps(analysis_result, indent=2),
-            ContentType='application/json'
-        )
-        
-        # Update job status
         job_key = f"analysis/{analysis_job_id}/job_info.json"
+        # result.json is the source of truth; job_info.json is just a small
+        # status pointer so status polls stay cheap
         job_info = {
             'jobId': analysis_job_id,
             'status': 'Completed',
             'videoId': video_id,
-            's3Uri': s3_uri,
-            'prompt': prompt,
-            'endTime': time.time(),
-            'completedTime': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
-            'processingTimeSeconds': time.time() - start_time
+            'resultKey': result_key,
+            'completedTime': completed_time,
+            'processingTimeSeconds': elapsed
         }
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=job_key,
-            Body=json.dumps(job_info, indent=2),
-            ContentType='application/json'
-        )
-        
-        print(f"Analysis completed and stored at s3://{bucket_name}/{result_key}")
-        print(f"Processing time: {time.time() - start_time:.2f} seconds")
-        print("=== ASYNC ANALYSIS PROCESSING END ===")
-        
+
+        # Both objects are machine-consumed, so write compact JSON and issue
+        # the two puts concurrently
+        put_futures = [
+            _EXECUTOR.submit(
+                s3_client.put_object,
+                Bucket=bucket_name,
+                Key=result_key,
+                Body=orjson.dumps(analysis_result),
+                ContentType='application/json'
+            ),
+            _EXECUTOR.submit(
+                s3_client.put_object,
+                Bucket=bucket_name,
+                Key=job_key,
+                Body=orjson.dumps(job_info),
+                ContentType='application/json'
+            ),
+        ]
+        for future in put_futures:
+            future.result()
+
+        logger.info("Analysis completed and stored at s3://%s/%s", bucket_name, result_key)
+        logger.info("Processing time: %.2f seconds", elapsed)
+        logger.info("=== ASYNC ANALYSIS PROCESSING END ===")
+
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': _jdumps({
                 'jobId': analysis_job_id,
                 'status': 'Completed',
-                'processingTime': time.time() - start_time
+                'processingTime': elapsed
             })
         }
         
     except Exception as e:
-        print(f"Async analysis processing failed: {e}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+        logger.exception("Async analysis processing failed")
         
         # Update job status to failed if we have the required info
         if 'analysis_job_id' in locals() and 'bucket_name' in locals():
             try:
                 job_key = f"analysis/{analysis_job_id}/job_info.json"
+                failed_at = time.time()
+                # Reuse whatever job_info we already built for this run so
+                # fields like videoId survive the failure upsert.
                 failed_job_info = {
+                    **(locals().get('job_info') or locals().get('initial_job_info') or {}),
                     'jobId': analysis_job_id,
                     'status': 'Failed',
                     'error': str(e),
-                    'endTime': time.time(),
-                    'failedTime': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+                    'endTime': failed_at,
+                    'failedTime': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(failed_at))
                 }
                 s3_client.put_object(
                     Bucket=bucket_name,
                     Key=job_key,
-                    Body=json.dumps(failed_job_info, indent=2),
+                    Body=orjson.dumps(failed_job_info),
                     ContentType='application/json'
                 )
-                print(f"Updated job status to failed in S3")
+                logger.error("Updated job status to failed in S3")
             except Exception as update_error:
-                print(f"Failed to update job status: {update_error}")
+                logger.error("Failed to update job status: %s", update_error)
         
-        print("=== ASYNC ANALYSIS PROCESSING END (ERROR) ===")
+        logger.error("=== ASYNC ANALYSIS PROCESSING END (ERROR) ===")
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': _jdumps({
                 'error': str(e),
                 'jobId': locals().get('analysis_job_id', 'unknown')
             })
@@ -769,399 +1052,332 @@ def process_analysis_async(event: Dict[str, Any]) -> Dict[str, Any]:
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Main Lambda handler for video understanding API"""
     
+    # SQS event source delivering queued analysis jobs
+    if 'Records' in event and event['Records'] and event['Records'][0].get('eventSource') == 'aws:sqs':
+        logger.info("Processing %s queued analysis job(s)", len(event['Records']))
+        for record in event['Records']:
+            process_analysis_async(orjson.loads(record['body']))
+        return {'statusCode': 200, 'body': ''}
+
     # Check if this is an async processing request (direct Lambda invoke, not API Gateway)
     if 'action' in event and event.get('action') == 'process_analysis':
-        print("Processing async analysis request")
+        logger.info("Processing async analysis request")
         return process_analysis_async(event)
-    
-    print(f"Received event: {event.get('httpMethod')} {event.get('path')}")
+
+    logger.info("Received event: %s %s", event.get('httpMethod'), event.get('path'))
     event_body = event.get('body', 'No body')
     if event_body and event_body != 'No body':
-        print(f"Event body preview: {event_body[:200]}...")
+        logger.info("Event body preview: %s...", event_body[:200])
     else:
-        print("Event body: None or empty")
-    print(f"Context: {context.function_name} - {context.aws_request_id}")
+        logger.info("Event body: None or empty")
+    logger.info("Context: %s - %s", context.function_name, context.aws_request_id)
     
-    # CORS headers
-    cors_headers = {
-        'Access-Control-Allow-Origin': os.environ.get('CORS_ORIGIN', 'http://localhost:3000'),
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, X-Amz-Date, Authorization, X-Api-Key, X-Amz-Security-Token',
-        'Content-Type': 'application/json'
-    }
+    cors_headers = CORS_HEADERS
     
     try:
         path = event.get('path', '')
         method = event.get('httpMethod', '')
         
-        # Handle preflight OPTIONS requests
+        # Handle preflight OPTIONS requests; 204 tells the browser and API
+        # Gateway there is no body to parse
         if method == 'OPTIONS':
             return {
-                'statusCode': 200,
-                'headers': cors_headers,
+                'statusCode': 204,
+                'headers': CORS_HEADERS_OPTIONS,
                 'body': ''
             }
         
-        print(f"Processing request: {method} {path}")
-        
-        if path == '/upload' and method == 'POST':
-            print("Routing to handle_upload")
-            return handle_upload(event, cors_headers)
-        elif path == '/analyze' and method == 'POST':
-            print("Routing to handle_analyze")
-            return handle_analyze(event, cors_headers, context)
-        elif path == '/embed' and method == 'POST':
-            print("Routing to handle_embed")
-            return handle_embed(event, cors_headers)
-        elif path == '/status' and method == 'GET':
-            print("Routing to handle_status")
-            return handle_status(event, cors_headers)
-        elif path == '/search' and method == 'GET':
-            print("Routing to handle_search")
-            return handle_search(event, cors_headers)
-        elif path == '/video-url' and method == 'GET':
-            print("Routing to handle_video_url")
-            return handle_video_url(event, cors_headers)
-        elif path == '/flush-opensearch' and method == 'POST':
-            print("Routing to handle_flush_opensearch")
-            return handle_flush_opensearch(event, cors_headers)
-        else:
-            print(f"No route found for {method} {path}")
+        logger.info("Processing request: %s %s", method, path)
+
+        route = ROUTES.get((path, method))
+        if route is None:
+            logger.info("No route found for %s %s", method, path)
             return {
                 'statusCode': 404,
                 'headers': cors_headers,
-                'body': json.dumps({'error': 'Not found'})
+                'body': _jdumps({'error': 'Not found'})
             }
+        if route is handle_analyze:
+            return route(event, cors_headers, context)
+        return route(event, cors_headers)
     
     except Exception as e:
-        print(f"CRITICAL ERROR in main handler: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+        logger.exception("CRITICAL ERROR in main handler")
         return {
             'statusCode': 500,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'Internal server error: {str(e)}'})
+            'body': _jdumps({'error': f'Internal server error: {str(e)}'})
         }
 
+@with_error_handler
 def handle_video_url(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Generate presigned URL for video playback"""
-    try:
-        print(f"🎬 === VIDEO URL REQUEST START ===")
-        print(f"📡 Request event: {json.dumps(event, indent=2)}")
-        print(f"🔒 CORS headers: {cors_headers}")
-        
-        query_params = event.get('queryStringParameters', {}) or {}
-        video_s3_uri = query_params.get('videoS3Uri')
-        
-        print(f"📹 Video S3 URI requested: {video_s3_uri}")
-        print(f"🔍 All query parameters: {query_params}")
-        
-        if not video_s3_uri:
-            print("❌ ERROR: videoS3Uri parameter is required but not provided")
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'videoS3Uri parameter is required'})
-            }
-        
-        # Parse S3 URI to get bucket and key
-        if not video_s3_uri.startswith('s3://'):
-            print(f"❌ ERROR: Invalid S3 URI format: {video_s3_uri}")
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Invalid S3 URI format'})
-            }
-        
-        # Remove s3:// prefix and split bucket/key
-        s3_path = video_s3_uri[5:]  # Remove 's3://'
-        parts = s3_path.split('/', 1)
-        print(f"🔗 S3 path after removing s3://: {s3_path}")
-        print(f"🪣 Parsed parts: {parts}")
-        
-        if len(parts) != 2:
-            print(f"❌ ERROR: Invalid S3 URI format - could not split bucket/key: {parts}")
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Invalid S3 URI format'})
-            }
-        
-        bucket_name, object_key = parts
-        print(f"🪣 Bucket: {bucket_name}")
-        print(f"🔑 Object key: {object_key}")
-        
-        # Check if object exists before generating presigned URL
-        try:
-            print(f"🔍 Checking if object exists in S3...")
-            s3_client.head_object(Bucket=bucket_name, Key=object_key)
-            print(f"✅ Object exists in S3: {bucket_name}/{object_key}")
-        except Exception as head_error:
-            print(f"❌ Object does not exist in S3: {head_error}")
-            return {
-                'statusCode': 404,
-                'headers': cors_headers,
-                'body': json.dumps({'error': f'Video file not found in S3: {object_key}'})
-            }
-        
-        # Generate presigned URL for video access (valid for 1 hour)
-        print(f"🔗 Generating presigned URL for {bucket_name}/{object_key}")
-        presigned_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': bucket_name, 'Key': object_key},
-            ExpiresIn=3600
-        )
-        
-        print(f"✅ Generated presigned URL successfully for {bucket_name}/{object_key}")
-        print(f"🌐 Presigned URL length: {len(presigned_url)}")
-        print(f"🌐 Presigned URL preview: {presigned_url[:100]}...")
-        response_data = {
-            'presignedUrl': presigned_url,
-            'videoS3Uri': video_s3_uri,
-            'bucket': bucket_name,
-            'key': object_key
-        }
-        
-        print(f"✅ Returning successful response with data: {json.dumps(response_data, indent=2)}")
-        print(f"🎬 === VIDEO URL REQUEST END ===")
-        
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("video-url event=%s", json.dumps(event))
+
+    query_params = event.get('queryStringParameters', {}) or {}
+    video_s3_uri = query_params.get('videoS3Uri')
+
+    if not video_s3_uri:
+        logger.info("videoS3Uri parameter is required but not provided")
         return {
-            'statusCode': 200,
+            'statusCode': 400,
             'headers': cors_headers,
-            'body': json.dumps(response_data)
+            'body': _jdumps({'error': 'videoS3Uri parameter is required'})
         }
     
-    except Exception as e:
-        print(f"❌ ERROR in handle_video_url: {str(e)}")
-        print(f"❌ Error type: {type(e).__name__}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
-        print(f"🎬 === VIDEO URL REQUEST END (ERROR) ===")
+    # Parse S3 URI to get bucket and key
+    parsed = _parse_s3_uri(video_s3_uri)
+    if parsed is None:
+        logger.info("Invalid S3 URI format: %s", video_s3_uri)
         return {
-            'statusCode': 500,
+            'statusCode': 400,
             'headers': cors_headers,
-            'body': json.dumps({'error': str(e)})
+            'body': _jdumps({'error': 'Invalid S3 URI format'})
         }
 
+    bucket_name, object_key = parsed
+
+    # Serve a cached presigned URL while it has comfortable lifetime left -
+    # repeat playback requests then skip the head_object + signing entirely
+    cache_key = f"{bucket_name}/{object_key}"
+    cached = _URL_CACHE.get(cache_key)
+    if cached and cached[1] - time.time() > _URL_REUSE_MARGIN:
+        _URL_CACHE.move_to_end(cache_key)
+        presigned_url = cached[0]
+        logger.debug("Reusing cached presigned URL for %s", cache_key)
+    else:
+        # No existence precheck: presigning is a purely local operation and
+        # a missing object simply 404s the browser's GET on the signed URL
+        # Generate presigned URL for video access (valid for 1 hour)
+        presigned_url = s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': object_key},
+            ExpiresIn=PRESIGNED_URL_TTL
+        )
+        _URL_CACHE[cache_key] = (presigned_url, time.time() + PRESIGNED_URL_TTL)
+        _URL_CACHE.move_to_end(cache_key)
+        while len(_URL_CACHE) > _URL_CACHE_MAX:
+            _URL_CACHE.popitem(last=False)
+    
+    logger.info("Generated presigned URL for %s/%s", bucket_name, object_key)
+    response_data = {
+        'presignedUrl': presigned_url,
+        'videoS3Uri': video_s3_uri,
+        'bucket': bucket_name,
+        'key': object_key
+    }
+    
+    return {
+        'statusCode': 200,
+        'headers': cors_headers,
+        'body': _jdumps(response_data)
+    }
+
+_UPLOAD_POST_CACHE: Dict[str, Any] = {}  # content_type -> (presigned_post, expiry_ts)
+
+def _presigned_post_for(content_type: str) -> Dict[str, Any]:
+    """Return a presigned POST policy for videos/ uploads of this content-type.
+
+    The policy uses a starts-with condition on the key, so one signature
+    covers every filename under videos/ and can be cached per content-type;
+    the caller substitutes the final key into the fields.
+    """
+    cached = _UPLOAD_POST_CACHE.get(content_type)
+    now = time.time()
+    if cached and cached[1] - now > _URL_REUSE_MARGIN:
+        return cached[0]
+
+    presigned_post = s3_client.generate_presigned_post(
+        Bucket=VIDEO_BUCKET,
+        Key='videos/${filename}',
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, 2147483648],  # 1 byte to 2GB
+            ['starts-with', '$key', 'videos/']
+        ],
+        ExpiresIn=PRESIGNED_URL_TTL
+    )
+    _UPLOAD_POST_CACHE[content_type] = (presigned_post, now + PRESIGNED_URL_TTL)
+    return presigned_post
+
+@with_error_handler
 def handle_upload(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Handle video upload to S3"""
-    try:
-        body = json.loads(event.get('body', '{}'))
-        filename = body.get('filename')
-        content_type = body.get('contentType', 'video/mp4')
-        
-        if not filename:
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Filename is required'})
-            }
-        
-        bucket_name = os.environ.get('VIDEO_BUCKET')
-        key = f"videos/{filename}"
-        
-        # Generate presigned POST instead of PUT
-        presigned_post = s3_client.generate_presigned_post(
-            Bucket=bucket_name,
-            Key=key,
-            Fields={'Content-Type': content_type},
-            Conditions=[
-                {'Content-Type': content_type},
-                ['content-length-range', 1, 2147483648]  # 1 byte to 2GB
-            ],
-            ExpiresIn=3600
-        )
-        
-        return {
-            'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps({
-                'uploadUrl': presigned_post['url'],
-                'fields': presigned_post['fields'],
-                'key': key,
-                'bucket': bucket_name
-            })
-        }
+    body = _jloads(event.get('body'))
+    filename = body.get('filename')
+    content_type = body.get('contentType', 'video/mp4')
     
-    except Exception as e:
+    if not filename:
         return {
-            'statusCode': 500,
+            'statusCode': 400,
             'headers': cors_headers,
-            'body': json.dumps({'error': str(e)})
+            'body': _jdumps({'error': 'Filename is required'})
         }
+    
+    bucket_name = VIDEO_BUCKET
+    key = f"videos/{filename}"
+
+    # Reuse a per-content-type policy and fill in the key for this upload
+    presigned_post = _presigned_post_for(content_type)
+
+    return {
+        'statusCode': 200,
+        'headers': cors_headers,
+        'body': _jdumps({
+            'uploadUrl': presigned_post['url'],
+            'fields': {**presigned_post['fields'], 'key': key},
+            'key': key,
+            'bucket': bucket_name
+        })
+    }
 
 def wait_for_s3_object(s3_uri: str, max_wait_seconds: int = 30) -> bool:
     """Wait for S3 object to be available with exponential backoff"""
-    if not s3_uri.startswith('s3://'):
-        print(f"Invalid S3 URI format: {s3_uri}")
-        return False
-    
-    # Parse S3 URI
-    s3_path = s3_uri[5:]  # Remove 's3://'
-    parts = s3_path.split('/', 1)
-    if len(parts) != 2:
-        print(f"Invalid S3 URI format: {s3_uri}")
+    parsed = _parse_s3_uri(s3_uri)
+    if parsed is None:
+        logger.info("Invalid S3 URI format: %s", s3_uri)
         return False
+
+    bucket_name, object_key = parsed
+    logger.info("Checking S3 object existence: bucket=%s, key=%s", bucket_name, object_key)
     
-    bucket_name, object_key = parts
-    print(f"Checking S3 object existence: bucket={bucket_name}, key={object_key}")
-    
-    import time
-    wait_time = 1  # Start with 1 second
+    wait_time = 0.25  # Start small so short uploads don't eat a full second
     total_waited = 0
-    
+
     while total_waited < max_wait_seconds:
         try:
-            response = s3_client.head_object(Bucket=bucket_name, Key=object_key)
-            file_size = response.get('ContentLength', 0)
-            print(f"S3 object found! Size: {file_size} bytes, waited {total_waited}s")
-            return True
+            response = s3_client.get_object_attributes(
+                Bucket=bucket_name,
+                Key=object_key,
+                ObjectAttributes=['ObjectSize', 'ETag']
+            )
+            file_size = response.get('ObjectSize', 0)
+            if file_size > 0:
+                logger.info("S3 object found! Size: %s bytes, waited %ss", file_size, total_waited)
+                return True
+            # Key exists but the body hasn't finalized yet - keep waiting
+            logger.info("S3 object present but empty, waited %ss, retrying in %ss...", total_waited, wait_time)
+            time.sleep(wait_time)
+            total_waited += wait_time
+            wait_time = min(wait_time * 1.5, 5)
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code')
-            if error_code == 'NoSuchKey':
-                print(f"S3 object not found yet, waited {total_waited}s, retrying in {wait_time}s...")
+            if error_code in ('NoSuchKey', '404'):
+                logger.info("S3 object not found yet, waited %ss, retrying in %ss...", total_waited, wait_time)
                 time.sleep(wait_time)
                 total_waited += wait_time
                 wait_time = min(wait_time * 1.5, 5)  # Exponential backoff, max 5s
             else:
-                print(f"S3 error checking object: {error_code} - {e}")
+                logger.error("S3 error checking object: %s - %s", error_code, e)
                 return False
         except Exception as e:
-            print(f"Unexpected error checking S3 object: {e}")
+            logger.error("Unexpected error checking S3 object: %s", e)
             return False
     
-    print(f"S3 object not found after waiting {max_wait_seconds} seconds")
+    logger.info("S3 object not found after waiting %s seconds", max_wait_seconds)
     return False
 
+@with_error_handler
 def handle_analysis_status(analysis_job_id: str, cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Check status of Pegasus analysis job and retrieve results from S3"""
+    logger.info("Checking analysis status for job: %s", analysis_job_id)
+    
+    bucket_name = VIDEO_BUCKET
+    job_key = f"analysis/{analysis_job_id}/job_info.json"
+    result_key = f"analysis/{analysis_job_id}/result.json"
+    
+    # Fetch job_info and result concurrently - the result fetch is only
+    # consumed for completed jobs, but starting it now overlaps the two
+    # S3 round-trips instead of serializing them; a miss is handled below
+    job_future = _EXECUTOR.submit(s3_client.get_object, Bucket=bucket_name, Key=job_key)
+    result_future = _EXECUTOR.submit(s3_client.get_object, Bucket=bucket_name, Key=result_key)
+
+    # First, check if job info exists
     try:
-        print(f"Checking analysis status for job: {analysis_job_id}")
-        
-        bucket_name = os.environ.get('VIDEO_BUCKET')
-        job_key = f"analysis/{analysis_job_id}/job_info.json"
-        result_key = f"analysis/{analysis_job_id}/result.json"
-        
-        # First, check if job info exists
+        job_response = job_future.result()
+        job_info = orjson.loads(job_response['Body'].read())
+        logger.info("Found job info: %s", job_info.get('status', 'Unknown'))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
+            logger.info("Analysis job %s not found", analysis_job_id)
+            return _json_response(404, {'error': f'Analysis job {analysis_job_id} not found'})
+        raise
+    
+    job_status = job_info.get('status', 'Unknown')
+    
+    if job_status == 'Completed':
+        # Try to get the analysis result (already in flight)
         try:
-            job_response = s3_client.get_object(Bucket=bucket_name, Key=job_key)
-            job_info = json.loads(job_response['Body'].read())
-            print(f"Found job info: {job_info.get('status', 'Unknown')}")
+            result_response = result_future.result()
+            result_data = orjson.loads(result_response['Body'].read())
+            logger.info("Retrieved analysis result for job %s", analysis_job_id)
+            
+            return _json_response(200, {
+                'status': 'Completed',
+                'jobId': analysis_job_id,
+                'videoId': result_data.get('videoId', 'unknown'),
+                'analysis': result_data.get('analysis', ''),
+                'finishReason': result_data.get('finishReason', ''),
+                'prompt': result_data.get('prompt', ''),
+                'processingTime': result_data.get('processingTimeSeconds', 0),
+                'completedTime': result_data.get('completedTime', ''),
+                'message': 'Analysis completed successfully'
+            })
+            
         except ClientError as e:
             if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
-                print(f"Analysis job {analysis_job_id} not found")
-                return {
-                    'statusCode': 404,
-                    'headers': cors_headers,
-                    'body': json.dumps({'error': f'Analysis job {analysis_job_id} not found'})
-                }
-            raise
-        
-        job_status = job_info.get('status', 'Unknown')
-        
-        if job_status == 'Completed':
-            # Try to get the analysis result
-            try:
-                result_response = s3_client.get_object(Bucket=bucket_name, Key=result_key)
-                result_data = json.loads(result_response['Body'].read())
-                print(f"Retrieved analysis result for job {analysis_job_id}")
-                
-                return {
-                    'statusCode': 200,
-                    'headers': cors_headers,
-                    'body': json.dumps({
-                        'status': 'Completed',
-                        'jobId': analysis_job_id,
-                        'videoId': result_data.get('videoId', 'unknown'),
-                        'analysis': result_data.get('analysis', ''),
-                        'finishReason': result_data.get('finishReason', ''),
-                        'prompt': result_data.get('prompt', ''),
-                        'processingTime': result_data.get('processingTimeSeconds', 0),
-                        'completedTime': result_data.get('completedTime', ''),
-                        'message': 'Analysis completed successfully'
-                    })
-                }
-                
-            except ClientError as e:
-                if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
-                    print(f"Result file not found for completed job {analysis_job_id}")
-                    return {
-                        'statusCode': 200,
-                        'headers': cors_headers,
-                        'body': json.dumps({
-                            'status': 'Completed',
-                            'message': 'Analysis completed but result file not found',
-                            'jobId': analysis_job_id
-                        })
-                    }
-                raise
-                
-        elif job_status == 'Failed':
-            return {
-                'statusCode': 200,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'status': 'Failed',
-                    'jobId': analysis_job_id,
-                    'error': job_info.get('error', 'Analysis failed'),
-                    'message': 'Analysis failed'
+                logger.info("Result file not found for completed job %s", analysis_job_id)
+                return _json_response(200, {
+                    'status': 'Completed',
+                    'message': 'Analysis completed but result file not found',
+                    'jobId': analysis_job_id
                 })
-            }
-        
-        else:  # InProgress or other status
-            return {
-                'statusCode': 200,
-                'headers': cors_headers,
-                'body': json.dumps({
-                    'status': job_status,
-                    'jobId': analysis_job_id,
-                    'message': f'Analysis is {job_status.lower()}',
-                    'videoId': job_info.get('videoId', 'unknown'),
-                    'submitTime': job_info.get('submitTime', '')
-                })
-            }
+            raise
             
-    except Exception as e:
-        print(f"Error checking analysis status: {e}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': f'Failed to check analysis status: {str(e)}'})
-        }
+    elif job_status == 'Failed':
+        return _json_response(200, {
+            'status': 'Failed',
+            'jobId': analysis_job_id,
+            'error': job_info.get('error', 'Analysis failed'),
+            'message': 'Analysis failed'
+        })
+    
+    else:  # InProgress or other status
+        return _json_response(200, {
+            'status': job_status,
+            'jobId': analysis_job_id,
+            'message': f'Analysis is {job_status.lower()}',
+            'videoId': job_info.get('videoId', 'unknown'),
+            'submitTime': job_info.get('submitTime', '')
+        })
+        
 
+@with_error_handler
 def handle_analyze(event: Dict[str, Any], cors_headers: Dict[str, str], context: Any) -> Dict[str, Any]:
     """Handle video analysis using Twelve Labs Pegasus - start analysis and return job ID"""
     try:
-        print("Starting video analysis...")
-        body = json.loads(event.get('body', '{}'))
+        body = _jloads(event.get('body'))
         s3_uri = body.get('s3Uri')
         prompt = body.get('prompt', 'Analyze this video and provide a detailed description')
         video_id = body.get('videoId', 'unknown')
-        
-        print(f"Analysis request - S3 URI: {s3_uri}, Video ID: {video_id}, Prompt length: {len(prompt)}")
-        
+
+        logger.info("Analysis request - S3 URI: %s, Video ID: %s, Prompt length: %d", s3_uri, video_id, len(prompt))
+
         if not s3_uri:
-            print("ERROR: S3 URI is required but not provided")
+            logger.info("S3 URI is required but not provided")
             return {
                 'statusCode': 400,
                 'headers': cors_headers,
-                'body': json.dumps({'error': 'S3 URI is required'})
-            }
-        
-        # Wait for S3 object to be available
-        if not wait_for_s3_object(s3_uri, max_wait_seconds=30):
-            return {
-                'statusCode': 404,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Video file not found in S3. Please ensure the upload completed successfully.'})
+                'body': _jdumps({'error': 'S3 URI is required'})
             }
         
+        # The client only calls /analyze after the presigned upload completes,
+        # so don't burn synchronous Lambda time polling S3 here - the async
+        # worker does a short availability check before invoking Bedrock
         # Generate unique analysis job ID
-        import uuid
-        import time
-        analysis_job_id = f"analysis_{int(time.time())}_{str(uuid.uuid4())[:8]}"
+        analysis_job_id = f"analysis_{int(time.time())}_{secrets.token_hex(4)}"
         
         # Create analysis job info to store in S3
         job_info = {
@@ -1174,56 +1390,53 @@ def handle_analyze(event: Dict[str, Any], cors_headers: Dict[str, str], context:
             'submitTime': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
         }
         
-        # Store job info in S3 first
-        bucket_name = os.environ.get('VIDEO_BUCKET')
+        bucket_name = VIDEO_BUCKET
         job_key = f"analysis/{analysis_job_id}/job_info.json"
-        
-        try:
-            s3_client.put_object(
-                Bucket=bucket_name,
-                Key=job_key,
-                Body=json.dumps(job_info, indent=2),
-                ContentType='application/json'
-            )
-            print(f"Stored analysis job info at s3://{bucket_name}/{job_key}")
-        except Exception as e:
-            print(f"Failed to store job info: {e}")
-            return {
-                'statusCode': 500,
-                'headers': cors_headers,
-                'body': json.dumps({'error': f'Failed to initialize analysis job: {str(e)}'})
-            }
-        
-        # Invoke Lambda asynchronously to process the analysis
+
+        # Dispatch the analysis job for async processing
         try:
-            lambda_client = boto3.client('lambda', region_name=os.environ.get('REGION', 'us-east-1'))
-            function_name = os.environ.get('LAMBDA_FUNCTION_NAME') or context.function_name
-            
-            # Create payload for async processing
+            # Create payload for async processing; job_info rides along in the
+            # message so the worker persists it as its first step
             async_payload = {
                 'action': 'process_analysis',  # Special action for async processing
                 'analysisJobId': analysis_job_id,
                 's3Uri': s3_uri,
                 'prompt': prompt,
                 'videoId': video_id,
-                'bucketName': bucket_name
+                'bucketName': bucket_name,
+                'jobInfo': job_info
             }
-            
-            print(f"Invoking Lambda function asynchronously for job {analysis_job_id}")
-            print(f"Function name: {function_name}")
-            print(f"Async payload: {json.dumps(async_payload, indent=2)}")
-            
-            # Invoke Lambda asynchronously (Event invocation type)
-            lambda_client.invoke(
-                FunctionName=function_name,
-                InvocationType='Event',  # Async invocation
-                Payload=json.dumps(async_payload)
-            )
-            
-            print(f"Lambda function invoked asynchronously for analysis job {analysis_job_id}")
-            
+
+            if ANALYSIS_QUEUE_URL:
+                # Preferred path: enqueue to SQS, which is bound to this Lambda
+                # as an event source. The job_info write moves to the worker,
+                # so the synchronous /analyze path is a single AWS RPC
+                logger.info("Queueing analysis job %s to SQS", analysis_job_id)
+                sqs_client.send_message(
+                    QueueUrl=ANALYSIS_QUEUE_URL,
+                    MessageBody=json.dumps(async_payload)
+                )
+            else:
+                # Legacy fallback for deployments without the analysis queue:
+                # persist job_info before the fire-and-forget invoke
+                s3_client.put_object(
+                    Bucket=bucket_name,
+                    Key=job_key,
+                    Body=orjson.dumps(job_info),
+                    ContentType='application/json'
+                )
+                function_name = os.environ.get('LAMBDA_FUNCTION_NAME') or context.function_name
+                logger.info("Invoking Lambda function asynchronously for job %s", analysis_job_id)
+                lambda_client.invoke(
+                    FunctionName=function_name,
+                    InvocationType='Event',  # Async invocation
+                    Payload=json.dumps(async_payload)
+                )
+
+            logger.info("Async processing dispatched for analysis job %s", analysis_job_id)
+
         except Exception as e:
-            print(f"Failed to invoke Lambda asynchronously: {e}")
+            logger.exception("Failed to dispatch async processing")
             # Update job status to failed
             job_info.update({
                 'status': 'Failed',
@@ -1234,21 +1447,21 @@ def handle_analyze(event: Dict[str, Any], cors_headers: Dict[str, str], context:
             s3_client.put_object(
                 Bucket=bucket_name,
                 Key=job_key,
-                Body=json.dumps(job_info, indent=2),
+                Body=orjson.dumps(job_info),
                 ContentType='application/json'
             )
             
             return {
                 'statusCode': 500,
                 'headers': cors_headers,
-                'body': json.dumps({'error': f'Failed to start analysis: {str(e)}'})
+                'body': _jdumps({'error': f'Failed to start analysis: {str(e)}'})
             }
         
         # Return job ID immediately for status checking
         return {
             'statusCode': 202,
             'headers': cors_headers,
-            'body': json.dumps({
+            'body': _jdumps({
                 'analysisJobId': analysis_job_id,
                 'status': 'processing',
                 'message': 'Analysis started successfully. Use /status endpoint to check progress.',
@@ -1257,58 +1470,45 @@ def handle_analyze(event: Dict[str, Any], cors_headers: Dict[str, str], context:
         }
     
     except json.JSONDecodeError as e:
-        print(f"JSON decode error in analyze: {e}")
+        logger.error("JSON decode error in analyze: %s", e)
         return {
             'statusCode': 400,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'Invalid JSON in request body: {str(e)}'})
+            'body': _jdumps({'error': f'Invalid JSON in request body: {str(e)}'})
         }
     except ClientError as e:
-        print(f"AWS ClientError in analyze: {e}")
+        logger.error("AWS ClientError in analyze: %s", e)
         error_code = e.response.get('Error', {}).get('Code', 'Unknown')
         error_message = e.response.get('Error', {}).get('Message', str(e))
-        print(f"Error code: {error_code}, Message: {error_message}")
+        logger.error("Error code: %s, Message: %s", error_code, error_message)
         return {
             'statusCode': 500,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'AWS Error ({error_code}): {error_message}'})
-        }
-    except Exception as e:
-        print(f"Unexpected error in analyze: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': f'Analysis failed: {str(e)}'})
+            'body': _jdumps({'error': f'AWS Error ({error_code}): {error_message}'})
         }
 
+@with_error_handler
 def handle_embed(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Handle video embedding generation using Twelve Labs Marengo (async)"""
     try:
-        print("Starting embedding generation...")
-        body = json.loads(event.get('body', '{}'))
+        logger.info("Starting embedding generation...")
+        body = _jloads(event.get('body'))
         s3_uri = body.get('s3Uri')
         video_id = body.get('videoId')
         
-        print(f"Embedding request - S3 URI: {s3_uri}, Video ID: {video_id}")
+        logger.info("Embedding request - S3 URI: %s, Video ID: %s", s3_uri, video_id)
         
         if not s3_uri or not video_id:
-            print(f"ERROR: Missing required parameters - S3 URI: {bool(s3_uri)}, Video ID: {bool(video_id)}")
+            logger.error("ERROR: Missing required parameters - S3 URI: %s, Video ID: %s", bool(s3_uri), bool(video_id))
             return {
                 'statusCode': 400,
                 'headers': cors_headers,
-                'body': json.dumps({'error': 'S3 URI and video ID are required'})
-            }
-        
-        # Wait for S3 object to be available
-        if not wait_for_s3_object(s3_uri, max_wait_seconds=45):
-            return {
-                'statusCode': 404,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Video file not found in S3. Please ensure the upload completed successfully.'})
+                'body': _jdumps({'error': 'S3 URI and video ID are required'})
             }
         
+        # The client only calls /embed after the presigned upload completes -
+        # a missing object surfaces through the async invocation status rather
+        # than a long head_object polling loop here
         # Use async invoke for Marengo with temporal segmentation
         model_input = {
             "inputType": "video",
@@ -1323,7 +1523,7 @@ def handle_embed(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[st
             "minClipSec": 2  # Minimum clip duration
         }
         
-        print(f"Calling Bedrock Marengo model with input: {json.dumps(model_input, indent=2)}")
+        logger.info("Calling Bedrock Marengo model with input: %s", json.dumps(model_input, indent=2))
         
         # Create a unique embedding folder that includes the video_id for later retrieval
         # Clean the video_id to remove path prefixes but keep the filename with extension
@@ -1337,26 +1537,26 @@ def handle_embed(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[st
             safe_video_id = safe_video_id.rsplit('.', 1)[0]  # Remove extension for folder name
         safe_video_id = safe_video_id.replace('/', '_').replace(' ', '_')  # Make filesystem safe
         
-        print(f"🔍 DEBUG: Original video_id: '{video_id}', clean_video_id: '{clean_video_id}', safe_video_id: '{safe_video_id}'")
+        logger.info("🔍 DEBUG: Original video_id: '%s', clean_video_id: '%s', safe_video_id: '%s'", video_id, clean_video_id, safe_video_id)
         response = bedrock_client.start_async_invoke(
             modelId='twelvelabs.marengo-embed-2-7-v1:0',
             modelInput=model_input,
             outputDataConfig={
                 's3OutputDataConfig': {
-                    's3Uri': f"s3://{os.environ.get('VIDEO_BUCKET')}/embeddings/{safe_video_id}/"
+                    's3Uri': f"s3://{VIDEO_BUCKET}/embeddings/{safe_video_id}/"
                 }
             }
         )
         
-        print(f"Bedrock async invoke response: {json.dumps(response, indent=2, default=str)}")
+        logger.info("Bedrock async invoke response: %s", json.dumps(response, indent=2, default=str))
         
         invocation_arn = response.get('invocationArn')
-        print(f"Successfully started embedding generation with ARN: {invocation_arn}")
+        logger.info("Successfully started embedding generation with ARN: %s", invocation_arn)
         
         return {
             'statusCode': 202,
             'headers': cors_headers,
-            'body': json.dumps({
+            'body': _jdumps({
                 'invocationArn': invocation_arn,
                 'status': 'processing',
                 'message': 'Embedding generation started'
@@ -1364,32 +1564,24 @@ def handle_embed(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[st
         }
     
     except json.JSONDecodeError as e:
-        print(f"JSON decode error in embed: {e}")
+        logger.error("JSON decode error in embed: %s", e)
         return {
             'statusCode': 400,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'Invalid JSON in request body: {str(e)}'})
+            'body': _jdumps({'error': f'Invalid JSON in request body: {str(e)}'})
         }
     except ClientError as e:
-        print(f"AWS ClientError in embed: {e}")
+        logger.error("AWS ClientError in embed: %s", e)
         error_code = e.response.get('Error', {}).get('Code', 'Unknown')
         error_message = e.response.get('Error', {}).get('Message', str(e))
-        print(f"Error code: {error_code}, Message: {error_message}")
+        logger.error("Error code: %s, Message: %s", error_code, error_message)
         return {
             'statusCode': 500,
             'headers': cors_headers,
-            'body': json.dumps({'error': f'AWS Error ({error_code}): {error_message}'})
-        }
-    except Exception as e:
-        print(f"Unexpected error in embed: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': f'Embedding generation failed: {str(e)}'})
+            'body': _jdumps({'error': f'AWS Error ({error_code}): {error_message}'})
         }
 
+@with_error_handler
 def handle_status(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
     """Check status of async invocation OR analysis job and retrieve results"""
     try:
@@ -1397,7 +1589,7 @@ def handle_status(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[s
         invocation_arn = query_params.get('invocationArn')
         analysis_job_id = query_params.get('analysisJobId')
         
-        print(f"Status check request - ARN: {invocation_arn}, Analysis Job ID: {analysis_job_id}")
+        logger.info("Status check request - ARN: %s, Analysis Job ID: %s", invocation_arn, analysis_job_id)
         
         # Handle analysis job status check
         if analysis_job_id:
@@ -1405,260 +1597,432 @@ def handle_status(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[s
         
         # Handle embedding status check (existing functionality)
         if not invocation_arn:
-            print("ERROR: Neither invocation ARN nor analysis job ID provided")
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Either invocationArn or analysisJobId parameter is required'})
-            }
+            logger.error("ERROR: Neither invocation ARN nor analysis job ID provided")
+            return _json_response(400, {'error': 'Either invocationArn or analysisJobId parameter is required'})
         
         # Get invocation status
-        print("Calling bedrock_client.get_async_invoke...")
+        logger.info("Calling bedrock_client.get_async_invoke...")
         response = bedrock_client.get_async_invoke(invocationArn=invocation_arn)
         
         status = response.get('status')
-        print(f"Bedrock response status: {status}")
+        logger.info("Bedrock response status: %s", status)
         
         if status == 'Completed':
             # Get the output S3 URI from Bedrock response
             output_data_config = response.get('outputDataConfig', {})
             s3_output_config = output_data_config.get('s3OutputDataConfig', {})
             output_s3_uri = s3_output_config.get('s3Uri')
-            
+
+            # Pollers that only want the status can skip the output.json GET
+            # (and the ingestion it triggers) and come back for the payload;
+            # the default keeps fetch-and-store so the demo flow is unchanged
+            if query_params.get('include_result', 'true') == 'false':
+                return _json_response(200, {
+                    'status': status,
+                    'output_s3_uri': output_s3_uri,
+                    'message': 'Embedding completed - result not fetched (include_result=false)'
+                })
+
             if output_s3_uri:
                 # Bedrock creates: s3://bucket/embeddings/{invocationId}
                 # The actual results are in: s3://bucket/embeddings/{invocationId}/output.json
-                uri_parts = output_s3_uri.replace('s3://', '').split('/')
-                bucket = uri_parts[0]
-                key = '/'.join(uri_parts[1:]) + '/output.json'
+                bucket, key_prefix = _parse_s3_uri(output_s3_uri)
+                key = key_prefix + '/output.json'
                 
                 try:
-                    print(f"Fetching result from S3: {bucket}/{key}")
-                    s3_response = s3_client.get_object(Bucket=bucket, Key=key)
-                    result_data = json.loads(s3_response['Body'].read())
-                    print(f"Retrieved result data structure: {list(result_data.keys())}")
+                    logger.info("Fetching result from S3: %s/%s", bucket, key)
+                    result_data = _load_output_json(bucket, key)
+                    logger.info("Retrieved result data structure: %s", list(result_data.keys()))
                     
                     # Store embeddings to both OpenSearch and S3 Vectors
                     storage_result = None
                     if 'data' in result_data and result_data['data']:
                         try:
-                            print("Storing embeddings to both OpenSearch and S3 Vectors...")
+                            logger.info("Storing embeddings to both OpenSearch and S3 Vectors...")
                             storage_result = store_embeddings_dual(response, result_data['data'])
-                            print(f"Dual storage result: {storage_result}")
+                            logger.info("Dual storage result: %s", storage_result)
                         except Exception as e:
-                            print(f"Failed to store embeddings: {e}")
+                            logger.error("Failed to store embeddings: %s", e)
                             storage_result = {'error': str(e)}
                     
                     # Return minimal data to avoid 413 error
-                    segments_count = len(result_data.get('data', [])) if 'data' in result_data else 0
-                    
-                    return {
-                        'statusCode': 200,
-                        'headers': cors_headers,
-                        'body': json.dumps({
-                            'status': status,
-                            'segments_processed': segments_count,
-                            'opensearch_stored': storage_result.get('opensearch', {}).get('stored_count', 0) if isinstance(storage_result, dict) else 0,
-                            's3vectors_stored': storage_result.get('s3vectors', {}).get('stored_count', 0) if isinstance(storage_result, dict) else 0,
-                            'video_id': storage_result.get('video_id', 'unknown') if isinstance(storage_result, dict) else 'unknown',
-                            'storage_times': {
-                                'opensearch_ms': storage_result.get('opensearch', {}).get('storage_time_ms', 0) if isinstance(storage_result, dict) else 0,
-                                's3vectors_ms': storage_result.get('s3vectors', {}).get('storage_time_ms', 0) if isinstance(storage_result, dict) else 0
-                            },
-                            'message': f'Embedding completed with {segments_count} segments stored to both systems'
-                        })
-                    }
+                    segments_count = len(result_data.get('data') or [])
+
+                    # Hoist the nested lookups once instead of re-walking
+                    # storage_result per response field
+                    sr = storage_result if isinstance(storage_result, dict) else {}
+                    os_stats = sr.get('opensearch', {})
+                    s3v_stats = sr.get('s3vectors', {})
+
+                    return _json_response(200, {
+                        'status': status,
+                        'segments_processed': segments_count,
+                        'opensearch_stored': os_stats.get('stored_count', 0),
+                        's3vectors_stored': s3v_stats.get('stored_count', 0),
+                        'video_id': sr.get('video_id', 'unknown'),
+                        'storage_times': {
+                            'opensearch_ms': os_stats.get('storage_time_ms', 0),
+                            's3vectors_ms': s3v_stats.get('storage_time_ms', 0)
+                        },
+                        'message': f'Embedding completed with {segments_count} segments stored to both systems'
+                    })
                 except Exception as e:
-                    return {
-                        'statusCode': 200,
-                        'headers': cors_headers,
-                        'body': json.dumps({
-                            'status': status,
-                            'message': f'Completed but could not retrieve result: {str(e)}'
-                        })
-                    }
-            else:
-                return {
-                    'statusCode': 200,
-                    'headers': cors_headers,
-                    'body': json.dumps({
+                    return _json_response(200, {
                         'status': status,
-                        'message': 'Completed but no output S3 URI found in response'
+                        'message': f'Completed but could not retrieve result: {str(e)}'
                     })
-                }
+            else:
+                return _json_response(200, {
+                    'status': status,
+                    'message': 'Completed but no output S3 URI found in response'
+                })
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps({
-                'status': status,
-                'message': f'Invocation is {status.lower()}'
-            })
-        }
+        return _json_response(200, {
+            'status': status,
+            'message': f'Invocation is {status.lower()}'
+        })
     
     except ClientError as e:
-        print(f"AWS ClientError in status: {e}")
+        logger.error("AWS ClientError in status: %s", e)
         error_code = e.response.get('Error', {}).get('Code', 'Unknown')
         error_message = e.response.get('Error', {}).get('Message', str(e))
-        print(f"Error code: {error_code}, Message: {error_message}")
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': f'AWS Error ({error_code}): {error_message}'})
-        }
+        logger.error("Error code: %s, Message: %s", error_code, error_message)
+        return _json_response(500, {'error': f'AWS Error ({error_code}): {error_message}'})
+
+_QUERY_EMB_CACHE = OrderedDict()  # sha256(query) -> (embedding, cached_at)
+_QUERY_EMB_CACHE_MAX = 512
+QUERY_EMB_TTL = 7 * 24 * 3600  # embeddings for a fixed model never go stale; 7d is housekeeping
+
+_INFLIGHT_EMBEDS: Dict[str, Future] = {}  # cache_key -> in-flight generation
+_INFLIGHT_LOCK = threading.Lock()
+
+def _encode_embedding_f16(embedding):
+    """Pack an embedding as little-endian float16, base64'd for JSON.
+
+    Roughly 7x smaller than the float list serialized as JSON text; float16
+    keeps ~3 significant digits, which is far inside the noise floor for
+    cosine ranking at k=10.
+    """
+    return base64.b64encode(struct.pack(f'<{len(embedding)}e', *embedding)).decode()
+
+def _decode_embedding_f16(encoded):
+    raw = base64.b64decode(encoded)
+    return list(struct.unpack(f'<{len(raw) // 2}e', raw))
+
+def _query_cache_key(query_text: str) -> str:
+    return hashlib.sha256(query_text.strip().lower().encode()).hexdigest()
+
+def get_query_embedding(query_text: str, use_cache: bool = True):
+    """Embed a search query with Marengo, with container + S3 caching.
+
+    Repeated queries skip the multi-second async-invoke/poll cycle: first a
+    module-level LRU (warm container), then an S3-backed cache shared across
+    containers. Raises TimeoutError when Bedrock doesn't finish in time.
+    """
+    cache_key = _query_cache_key(query_text)
+    now = time.time()
+
+    if use_cache:
+        cached = _QUERY_EMB_CACHE.get(cache_key)
+        if cached and now - cached[1] < QUERY_EMB_TTL:
+            _QUERY_EMB_CACHE.move_to_end(cache_key)
+            logger.info("Query embedding cache hit (memory) for: %s", query_text)
+            return cached[0]
+
+        try:
+            s3_response = s3_client.get_object(
+                Bucket=VIDEO_BUCKET,
+                Key=f"search-embeddings/cache/{cache_key}.json"
+            )
+            entry = orjson.loads(s3_response['Body'].read())
+            if now - entry.get('cachedAt', 0) < QUERY_EMB_TTL:
+                if 'embedding_f16' in entry:
+                    embedding = _decode_embedding_f16(entry['embedding_f16'])
+                else:  # entries written before the f16 encoding
+                    embedding = entry['embedding']
+                _remember_query_embedding(cache_key, embedding, entry.get('cachedAt', now))
+                logger.info("Query embedding cache hit (S3) for: %s", query_text)
+                return embedding
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'NoSuchKey':
+                logger.error("Query embedding cache read failed: %s", e)
+
+    # Coalesce concurrent identical queries: the first caller in this
+    # container runs the Bedrock cycle, later ones wait on its future
+    # instead of firing a duplicate (billable) async invoke
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT_EMBEDS.get(cache_key)
+        owner = inflight is None
+        if owner:
+            inflight = Future()
+            _INFLIGHT_EMBEDS[cache_key] = inflight
+
+    if not owner:
+        logger.info("Joining in-flight embedding generation for: %s", query_text)
+        return inflight.result(timeout=30)
+
+    try:
+        query_embedding = _generate_query_embedding(query_text, cache_key, now)
+        inflight.set_result(query_embedding)
+        return query_embedding
+    except BaseException as e:
+        inflight.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT_EMBEDS.pop(cache_key, None)
+
+def _generate_query_embedding(query_text: str, cache_key: str, now: float):
+    """Run the Marengo async-invoke/poll cycle and cache the result"""
+    # Generate embedding for query text using Marengo (async)
+    model_input = {
+        "inputType": "text",
+        "inputText": query_text
+    }
+
+    logger.info("Starting async query embedding generation...")
+    response = bedrock_client.start_async_invoke(
+        modelId='twelvelabs.marengo-embed-2-7-v1:0',
+        modelInput=model_input,
+        outputDataConfig=SEARCH_OUTPUT_CONFIG
+    )
+
+    invocation_arn = response.get('invocationArn')
+    logger.info("Started async embedding with ARN: %s", invocation_arn)
+
+    # Poll for completion (max 30 seconds for Lambda timeout). Text
+    # embeddings usually finish in a few seconds, so back off from 200ms
+    # rather than sleeping a flat second; jitter avoids sync with Bedrock's
+    # status updates. The deadline uses monotonic time so jitter doesn't
+    # drift the budget.
+    max_wait = 25  # seconds
+    delay = 0.2
+    deadline = time.monotonic() + max_wait
+    started = time.monotonic()
+    query_embedding = None
+    timed_out = True
+
+    while time.monotonic() < deadline:
+        status_response = bedrock_client.get_async_invoke(invocationArn=invocation_arn)
+        status = status_response.get('status')
+        logger.info("Embedding status: %s (waited %.1fs)", status, time.monotonic() - started)
+
+        if status == 'Completed':
+            # Get the result
+            output_data_config = status_response.get('outputDataConfig', {})
+            s3_output_config = output_data_config.get('s3OutputDataConfig', {})
+            output_s3_uri = s3_output_config.get('s3Uri')
+
+            if output_s3_uri:
+                bucket, key_prefix = _parse_s3_uri(output_s3_uri)
+                key = key_prefix + '/output.json'
+
+                s3_response = s3_client.get_object(Bucket=bucket, Key=key)
+                result_data = orjson.loads(s3_response['Body'].read())
+
+                if 'data' in result_data and result_data['data'] and 'embedding' in result_data['data'][0]:
+                    query_embedding = result_data['data'][0]['embedding']
+                    logger.info("Retrieved query embedding length: %s", len(query_embedding))
+                    timed_out = False
+                    break
+
+        elif status in ['Failed', 'Cancelled']:
+            raise Exception(f"Embedding generation {status.lower()}")
+
+        time.sleep(delay + random.uniform(0, 0.1))
+        delay = min(delay * 1.5, 2.0)
+
+    if timed_out:
+        raise TimeoutError('Query embedding generation timed out')
+
+    if query_embedding is not None:
+        _remember_query_embedding(cache_key, query_embedding, now)
+        # Persist off the hot path so the cache write doesn't delay the search
+        _EXECUTOR.submit(
+            s3_client.put_object,
+            Bucket=VIDEO_BUCKET,
+            Key=f"search-embeddings/cache/{cache_key}.json",
+            Body=orjson.dumps({'embedding_f16': _encode_embedding_f16(query_embedding),
+                               'cachedAt': now, 'query': query_text}),
+            ContentType='application/json'
+        )
+
+    return query_embedding
+
+def _safe_search_result(future, backend_name, timeout=30):
+    """Resolve a search future, mapping failures to the empty-result shape"""
+    try:
+        return future.result(timeout=timeout)
     except Exception as e:
-        print(f"Unexpected error in status check: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"Full traceback: {traceback.format_exc()}")
+        logger.error("%s search failed: %s", backend_name, e)
         return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': f'Status check failed: {str(e)}'})
+            'results': [],
+            'total': 0,
+            'search_time_ms': 0,
+            'error': str(e)
         }
 
+def _remember_query_embedding(cache_key, embedding, cached_at):
+    _QUERY_EMB_CACHE[cache_key] = (embedding, cached_at)
+    _QUERY_EMB_CACHE.move_to_end(cache_key)
+    while len(_QUERY_EMB_CACHE) > _QUERY_EMB_CACHE_MAX:
+        _QUERY_EMB_CACHE.popitem(last=False)
+
+def _continue_search(invocation_arn):
+    """Finish a non-blocking search once its embedding job completes.
+
+    Pairs with wait=false on /search: the client holds the invocationArn and
+    re-calls with arn=... instead of the Lambda burning billable seconds in
+    the polling loop. Returns 202 while the embedding is still running.
+    """
+    status_response = bedrock_client.get_async_invoke(invocationArn=invocation_arn)
+    status = status_response.get('status')
+
+    if status in ['Failed', 'Cancelled']:
+        return _json_response(500, {'error': f'Embedding generation {status.lower()}',
+                                    'invocationArn': invocation_arn})
+    if status != 'Completed':
+        return _json_response(202, {'status': status, 'invocationArn': invocation_arn,
+                                    'message': 'Embedding still in progress - retry with the same arn'})
+
+    output_s3_uri = status_response.get('outputDataConfig', {}) \
+        .get('s3OutputDataConfig', {}).get('s3Uri')
+    if not output_s3_uri:
+        return _json_response(500, {'error': 'Completed but no output S3 URI found'})
+
+    bucket, key_prefix = _parse_s3_uri(output_s3_uri)
+    result_data = _load_output_json(bucket, key_prefix + '/output.json')
+    data = result_data.get('data') or []
+    if not data or 'embedding' not in data[0]:
+        return _json_response(500, {'error': 'Failed to generate query embedding'})
+
+    comparison = _dual_search(data[0]['embedding'])
+    return _json_response(200, {
+        'comparison': comparison,
+        'invocationArn': invocation_arn,
+        'message': 'Dual search completed - compare OpenSearch vs S3 Vectors performance and results'
+    })
+
+def _dual_search(query_embedding):
+    """Run both backends for one embedding, overlapping the round-trips"""
+    os_future = _EXECUTOR.submit(search_opensearch, query_embedding, 10)
+    s3v_future = _EXECUTOR.submit(search_s3_vectors, query_embedding, 10)
+    return {
+        'opensearch': _safe_search_result(os_future, 'OpenSearch'),
+        's3vectors': _safe_search_result(s3v_future, 'S3 Vectors')
+    }
+
+@with_error_handler
 def handle_search(event: Dict[str, Any], cors_headers: Dict[str, str]) -> Dict[str, Any]:
-    """Handle vector similarity search"""
-    try:
-        print("Starting search request...")
-        query_params = event.get('queryStringParameters', {}) or {}
-        query_text = query_params.get('q', '')
-        print(f"Search query: {query_text}")
-        
-        if not query_text:
-            return {
-                'statusCode': 400,
-                'headers': cors_headers,
-                'body': json.dumps({'error': 'Query parameter q is required'})
-            }
-        
-        # Generate embedding for query text using Marengo (async)
-        model_input = {
-            "inputType": "text",
-            "inputText": query_text
-        }
-        
-        try:
-            print("Starting async query embedding generation...")
+    """Handle vector similarity search (single query or batched ?q=a&q=b)"""
+    logger.info("Starting search request...")
+    query_params = event.get('queryStringParameters', {}) or {}
+
+    # Continuation of a non-blocking search started with wait=false
+    invocation_arn = query_params.get('arn')
+    if invocation_arn:
+        return _continue_search(invocation_arn)
+
+    multi_params = event.get('multiValueQueryStringParameters') or {}
+    queries = [q.strip() for q in (multi_params.get('q') or [query_params.get('q', '')]) if q.strip()]
+    logger.info("Search queries: %s", queries)
+
+    if not queries:
+        return _json_response(400, {'error': 'Query parameter q is required'})
+
+    # Reject junk before paying for a Bedrock invocation: over-long strings
+    # and queries with no word characters (pure punctuation/whitespace)
+    for q in queries:
+        if len(q) > 512 or not _WORD_CHAR_RE.search(q):
+            return _json_response(400, {
+                'error': 'Query must be 1-512 characters with at least one word character',
+                'query': q
+            })
+
+    use_cache = query_params.get('no_cache') != '1'
+
+    # Non-blocking mode: kick off the embedding and hand back the ARN
+    # instead of holding the Lambda through the 25s polling loop; cached
+    # queries still answer in full immediately
+    if query_params.get('wait') == 'false' and len(queries) == 1:
+        cached = _QUERY_EMB_CACHE.get(_query_cache_key(queries[0])) if use_cache else None
+        if cached is None:
             response = bedrock_client.start_async_invoke(
                 modelId='twelvelabs.marengo-embed-2-7-v1:0',
-                modelInput=model_input,
-                outputDataConfig={
-                    's3OutputDataConfig': {
-                        's3Uri': f"s3://{os.environ.get('VIDEO_BUCKET')}/search-embeddings/"
-                    }
-                }
+                modelInput={"inputType": "text", "inputText": queries[0]},
+                outputDataConfig=SEARCH_OUTPUT_CONFIG
             )
-            
-            invocation_arn = response.get('invocationArn')
-            print(f"Started async embedding with ARN: {invocation_arn}")
-            
-            # Poll for completion (max 30 seconds for Lambda timeout)
-            import time
-            max_wait = 25  # seconds
-            poll_interval = 1  # second
-            waited = 0
-            
-            while waited < max_wait:
-                status_response = bedrock_client.get_async_invoke(invocationArn=invocation_arn)
-                status = status_response.get('status')
-                print(f"Embedding status: {status} (waited {waited}s)")
-                
-                if status == 'Completed':
-                    # Get the result
-                    output_data_config = status_response.get('outputDataConfig', {})
-                    s3_output_config = output_data_config.get('s3OutputDataConfig', {})
-                    output_s3_uri = s3_output_config.get('s3Uri')
-                    
-                    if output_s3_uri:
-                        uri_parts = output_s3_uri.replace('s3://', '').split('/')
-                        bucket = uri_parts[0]
-                        key = '/'.join(uri_parts[1:]) + '/output.json'
-                        
-                        s3_response = s3_client.get_object(Bucket=bucket, Key=key)
-                        result_data = json.loads(s3_response['Body'].read())
-                        
-                        if 'data' in result_data and result_data['data'] and 'embedding' in result_data['data'][0]:
-                            query_embedding = result_data['data'][0]['embedding']
-                            print(f"Retrieved query embedding length: {len(query_embedding)}")
-                            break
-                    
-                elif status in ['Failed', 'Cancelled']:
-                    raise Exception(f"Embedding generation {status.lower()}")
-                
-                time.sleep(poll_interval)
-                waited += poll_interval
-            
-            if waited >= max_wait:
-                return {
-                    'statusCode': 408,
-                    'headers': cors_headers,
-                    'body': json.dumps({'error': 'Query embedding generation timed out'})
-                }
-            
-            if not query_embedding:
-                return {
-                    'statusCode': 500,
-                    'headers': cors_headers,
-                    'body': json.dumps({'error': 'Failed to generate query embedding'})
-                }
-            
-        except Exception as e:
-            print(f"Failed to generate embedding: {e}")
-            return {
-                'statusCode': 500,
-                'headers': cors_headers,
-                'body': json.dumps({'error': f'Failed to generate embedding: {str(e)}'})
-            }
-        
-        # Search both OpenSearch and S3 Vectors in parallel for comparison
-        print("Starting dual search: OpenSearch vs S3 Vectors...")
-        
-        opensearch_result = {}
-        s3vectors_result = {}
-        
-        # Search OpenSearch
-        try:
-            print("Searching OpenSearch...")
-            opensearch_result = search_opensearch(query_embedding, top_k=10)
-        except Exception as e:
-            print(f"OpenSearch search failed: {e}")
-            opensearch_result = {
-                'results': [],
-                'total': 0,
-                'search_time_ms': 0,
-                'error': str(e)
-            }
-        
-        # Search S3 Vectors
-        try:
-            print("Searching S3 Vectors...")
-            s3vectors_result = search_s3_vectors(query_embedding, top_k=10)
-        except Exception as e:
-            print(f"S3 Vectors search failed: {e}")
-            s3vectors_result = {
-                'results': [],
-                'total': 0,
-                'search_time_ms': 0,
-                'error': str(e)
-            }
-        
-        return {
-            'statusCode': 200,
-            'headers': cors_headers,
-            'body': json.dumps({
-                'comparison': {
-                    'opensearch': opensearch_result,
-                    's3vectors': s3vectors_result
-                },
-                'query': query_text,
-                'message': 'Dual search completed - compare OpenSearch vs S3 Vectors performance and results'
+            return _json_response(202, {
+                'status': 'InProgress',
+                'invocationArn': response.get('invocationArn'),
+                'query': queries[0],
+                'message': 'Embedding started - poll /search?arn=... for the result'
             })
-        }
-    
+
+    try:
+        if len(queries) == 1:
+            embeddings = [get_query_embedding(queries[0], use_cache=use_cache)]
+        else:
+            # Batch mode: embed every query concurrently so N queries pay one
+            # Bedrock round-trip of latency, not N
+            embedding_futures = [
+                _EXECUTOR.submit(get_query_embedding, q, use_cache)
+                for q in queries
+            ]
+            embeddings = [f.result() for f in embedding_futures]
+    except TimeoutError:
+        return _json_response(408, {'error': 'Query embedding generation timed out'})
     except Exception as e:
-        print(f"Search handler failed: {e}")
-        return {
-            'statusCode': 500,
-            'headers': cors_headers,
-            'body': json.dumps({'error': str(e)})
+        logger.error("Failed to generate embedding: %s", e)
+        return _json_response(500, {'error': f'Failed to generate embedding: {str(e)}'})
+
+    if any(embedding is None for embedding in embeddings):
+        return _json_response(500, {'error': 'Failed to generate query embedding'})
+
+    # Search both OpenSearch and S3 Vectors in parallel for comparison -
+    # independent HTTP backends, so wall time is the slowest leg, not the sum
+    logger.info("Starting dual search: OpenSearch vs S3 Vectors...")
+
+    if len(queries) == 1:
+        comparison = _dual_search(embeddings[0])
+        return _json_response(200, {
+            'comparison': comparison,
+            'query': queries[0],
+            'message': 'Dual search completed - compare OpenSearch vs S3 Vectors performance and results'
+        })
+
+    # Submit all 2N backend calls before resolving any so the whole batch is
+    # in flight at once (submitting _dual_search itself to the pool could
+    # deadlock it - workers would block waiting on tasks behind them)
+    search_futures = [
+        (_EXECUTOR.submit(search_opensearch, emb, 10),
+         _EXECUTOR.submit(search_s3_vectors, emb, 10))
+        for emb in embeddings
+    ]
+    batch_results = [
+        {
+            'query': q,
+            'comparison': {
+                'opensearch': _safe_search_result(os_future, 'OpenSearch'),
+                's3vectors': _safe_search_result(s3v_future, 'S3 Vectors')
+            }
         }
+        for q, (os_future, s3v_future) in zip(queries, search_futures)
+    ]
+    return _json_response(200, {
+        'results': batch_results,
+        'queries': queries,
+        'message': f'Batched dual search completed for {len(queries)} queries'
+    })
+
+# (path, method) -> handler; defined after the handlers so the references
+# resolve at import time. handler() special-cases handle_analyze's context arg.
+ROUTES = {
+    ('/upload', 'POST'): handle_upload,
+    ('/analyze', 'POST'): handle_analyze,
+    ('/embed', 'POST'): handle_embed,
+    ('/status', 'GET'): handle_status,
+    ('/search', 'GET'): handle_search,
+    ('/video-url', 'GET'): handle_video_url,
+    ('/flush-opensearch', 'POST'): handle_flush_opensearch,
+}
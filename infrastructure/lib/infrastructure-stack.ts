@@ -6,6 +6,8 @@ import * as iam from 'aws-cdk-lib/aws-iam';
 import * as cloudfront from 'aws-cdk-lib/aws-cloudfront';
 import * as origins from 'aws-cdk-lib/aws-cloudfront-origins';
 import * as opensearchserverless from 'aws-cdk-lib/aws-opensearchserverless';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import { SqsEventSource } from 'aws-cdk-lib/aws-lambda-event-sources';
 import { Construct } from 'constructs';
 import * as path from 'path';
 
@@ -174,6 +176,7 @@ export class InfrastructureStack extends cdk.Stack {
               actions: [
                 's3:DeleteObject',
                 's3:GetObject',
+                's3:GetObjectAttributes',
                 's3:PutObject',
               ],
               resources: [videoBucket.arnForObjects('*')],
@@ -261,6 +264,13 @@ export class InfrastructureStack extends cdk.Stack {
       }]),
     });
 
+    // SQS queue that feeds async analysis jobs back into the Lambda,
+    // replacing the synchronous Lambda self-invoke on the /analyze path
+    const analysisQueue = new sqs.Queue(this, 'AnalysisQueue', {
+      // Must cover the Lambda timeout so in-flight jobs aren't redelivered
+      visibilityTimeout: cdk.Duration.minutes(15),
+    });
+
     // Lambda function
     const videoProcessingFunction = new lambda.Function(this, 'VideoProcessingFunction', {
       runtime: lambda.Runtime.PYTHON_3_11,
@@ -274,11 +284,21 @@ export class InfrastructureStack extends cdk.Stack {
                 const { execSync } = require('child_process');
                 const backendPath = path.join(__dirname, '../../backend');
                 
-                // Install dependencies locally
-                execSync(`pip install -r requirements.txt -t ${outputDir}`, {
-                  cwd: backendPath,
-                  stdio: 'inherit',
-                });
+                // Install dependencies locally. orjson ships a compiled
+                // extension, so force Lambda-compatible (manylinux x86_64,
+                // CPython 3.11) wheels - a host-platform wheel from a
+                // macOS/Windows dev machine would fail to import at runtime.
+                // --only-binary makes pip error out (falling back to Docker)
+                // rather than silently building a host-platform sdist.
+                execSync(
+                  'pip install -r requirements.txt ' +
+                  '--platform manylinux2014_x86_64 --implementation cp ' +
+                  `--python-version 3.11 --only-binary=:all: -t ${outputDir}`,
+                  {
+                    cwd: backendPath,
+                    stdio: 'inherit',
+                  }
+                );
                 
                 // Copy source files
                 execSync(`cp -r ${backendPath}/* ${outputDir}/`, {
@@ -307,9 +327,16 @@ export class InfrastructureStack extends cdk.Stack {
         REGION: this.region,
         AWS_ACCOUNT_ID: this.account,
         CLOUDFRONT_DOMAIN: distribution.domainName,
+        ANALYSIS_QUEUE_URL: analysisQueue.queueUrl,
       },
     });
 
+    // Wire the analysis queue to the Lambda and allow the handler to enqueue
+    videoProcessingFunction.addEventSource(new SqsEventSource(analysisQueue, {
+      batchSize: 1,
+    }));
+    analysisQueue.grantSendMessages(lambdaRole);
+
     // API Gateway
     const api = new apigateway.RestApi(this, 'VideoUnderstandingApi', {
       restApiName: 'Video Understanding API',
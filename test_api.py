@@ -8,6 +8,15 @@ import json
 import sys
 import os
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One keep-alive session for the whole script - reuses the TLS connection to
+# API Gateway across calls instead of re-handshaking each time
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.3)))
+
 def test_api(api_url):
     """Test the deployed API endpoints"""
     
@@ -16,7 +25,7 @@ def test_api(api_url):
     # Test 1: Upload endpoint (should return error without proper payload)
     print("\n1. Testing /upload endpoint...")
     try:
-        response = requests.post(f"{api_url}/upload", 
+        response = SESSION.post(f"{api_url}/upload", 
                                json={"filename": "test.mp4", "contentType": "video/mp4"})
         if response.status_code == 200:
             print("✅ Upload endpoint working")
@@ -31,7 +40,7 @@ def test_api(api_url):
     # Test 2: Search endpoint (should work even without data)
     print("\n2. Testing /search endpoint...")
     try:
-        response = requests.get(f"{api_url}/search?q=test")
+        response = SESSION.get(f"{api_url}/search?q=test")
         if response.status_code == 200:
             print("✅ Search endpoint working")
             data = response.json()
@@ -45,7 +54,7 @@ def test_api(api_url):
     # Test 3: Analyze endpoint (should return error without S3 URI)
     print("\n3. Testing /analyze endpoint...")
     try:
-        response = requests.post(f"{api_url}/analyze", 
+        response = SESSION.post(f"{api_url}/analyze", 
                                json={"prompt": "test"})
         if response.status_code == 400:
             print("✅ Analyze endpoint working (expected 400 error)")
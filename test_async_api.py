@@ -8,6 +8,16 @@ import json
 import time
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One keep-alive session for the whole script - reuses the TLS connection to
+# API Gateway across calls instead of re-handshaking each time
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.3)))
 
 # API Gateway URL from deployment - use environment variables for dynamic deployment
 API_BASE_URL = os.environ.get('API_BASE_URL', "https://your-api-gateway-url/prod")
@@ -34,7 +44,7 @@ def test_async_analysis():
         "prompt": "Analyze this video and describe what you see"
     }
     
-    response = requests.post(f"{API_BASE_URL}/analyze", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/analyze", json=payload)
     print(f"Status: {response.status_code}")
     print(f"Response: {response.json()}")
     
@@ -56,7 +66,7 @@ def test_async_embedding():
         "videoId": "test-video-001"
     }
     
-    response = requests.post(f"{API_BASE_URL}/embed", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/embed", json=payload)
     print(f"Status: {response.status_code}")
     print(f"Response: {response.json()}")
     
@@ -73,7 +83,7 @@ def check_status(invocation_arn, operation_name):
     """Check status of async operation"""
     print(f"\n📊 Checking status for {operation_name}...")
     
-    response = requests.get(f"{API_BASE_URL}/status", params={"invocationArn": invocation_arn})
+    response = SESSION.get(f"{API_BASE_URL}/status", params={"invocationArn": invocation_arn})
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -94,18 +104,22 @@ def main():
     print("🚀 Testing Async Twelve Labs Models Integration")
     print("=" * 50)
     
-    # Test analysis
-    analysis_arn = test_async_analysis()
-    
-    # Test embedding
-    embedding_arn = test_async_embedding()
-    
-    # Check status immediately (should be InProgress)
-    if analysis_arn:
-        check_status(analysis_arn, "Video Analysis")
-    
-    if embedding_arn:
-        check_status(embedding_arn, "Embedding Generation")
+    # Kick off analysis and embedding concurrently - they're independent
+    # calls, so the wall time is the slower of the two instead of the sum
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        analysis_future = pool.submit(test_async_analysis)
+        embedding_future = pool.submit(test_async_embedding)
+        analysis_arn = analysis_future.result()
+        embedding_arn = embedding_future.result()
+
+        # Check status immediately (should be InProgress)
+        status_futures = []
+        if analysis_arn:
+            status_futures.append(pool.submit(check_status, analysis_arn, "Video Analysis"))
+        if embedding_arn:
+            status_futures.append(pool.submit(check_status, embedding_arn, "Embedding Generation"))
+        for future in status_futures:
+            future.result()
     
     print("\n💡 Note: Both operations are now asynchronous.")
     print("   Use the status endpoint to check for completion.")
@@ -8,6 +8,16 @@ import json
 import time
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One keep-alive session for the whole script - reuses the TLS connection to
+# API Gateway across calls instead of re-handshaking each time
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.3)))
 
 # API Gateway URL from deployment - use environment variables for dynamic deployment
 API_BASE_URL = os.environ.get('API_BASE_URL', "https://your-api-gateway-url/prod")
@@ -34,7 +44,7 @@ def test_sync_analysis():
         "prompt": "Analyze this video and describe what you see"
     }
     
-    response = requests.post(f"{API_BASE_URL}/analyze", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/analyze", json=payload)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -55,7 +65,7 @@ def test_async_embedding():
         "videoId": "test-video-hybrid-001"
     }
     
-    response = requests.post(f"{API_BASE_URL}/embed", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/embed", json=payload)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 202:
@@ -71,7 +81,7 @@ def check_embedding_status(invocation_arn):
     """Check status of async embedding operation"""
     print(f"\n📊 Checking embedding status...")
     
-    response = requests.get(f"{API_BASE_URL}/status", params={"invocationArn": invocation_arn})
+    response = SESSION.get(f"{API_BASE_URL}/status", params={"invocationArn": invocation_arn})
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -97,11 +107,14 @@ def main():
     print("   • Marengo: Asynchronous embeddings (check status)")
     print("=" * 55)
     
-    # Test synchronous analysis
-    analysis_success = test_sync_analysis()
-    
-    # Test async embedding
-    embedding_arn = test_async_embedding()
+    # Run the sync analysis and the embedding kickoff concurrently - the
+    # Pegasus call blocks for a while and the Marengo kickoff doesn't need
+    # to wait behind it
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        analysis_future = pool.submit(test_sync_analysis)
+        embedding_future = pool.submit(test_async_embedding)
+        analysis_success = analysis_future.result()
+        embedding_arn = embedding_future.result()
     
     # Check embedding status
     if embedding_arn: